@@ -0,0 +1,136 @@
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+
+class ArticleFragmentCache:
+    """
+    The viewer-independent part of serialized articles, cached between
+    requests.
+
+    Entries are keyed by slug and by version numbers that move whenever
+    what they show may have changed: the article's version on saves,
+    reactions, ratings, favorites and comments, its author's on profile
+    edits and follows, and a global generation on `clear()`. Stale entries
+    are never deleted, only no longer looked up, and expire after
+    `ARTICLE_CACHE['TIMEOUT']`. Fields that depend on the viewer are left
+    out and merged in per request.
+
+    Versions are created only for articles that exist, expire after twice
+    the entries' timeout, and restart from the clock so that a recreated
+    version never repeats a number entries may still be stored under.
+
+    Versions are bumped both at once and when the transaction commits, so
+    a reader filling the cache in between cannot store uncommitted or
+    outdated rows under the final version.
+    """
+    key_prefix = 'article-cache'
+    viewer_fields = ('like_status', 'dislike_status')
+
+    def __init__(self):
+        config = settings.ARTICLE_CACHE
+        self.enabled = config['ENABLED']
+        self.timeout = config['TIMEOUT']
+        self.backend_alias = config['BACKEND']
+        # versions outlive the entries stored under them
+        self.version_timeout = 2 * self.timeout
+
+    @property
+    def backend(self):
+        return caches[self.backend_alias]
+
+    def key(self, *parts):
+        return ':'.join(str(part) for part in (self.key_prefix,) + parts)
+
+    def fetch(self, slug, author_of, load):
+        """
+        The cached representation of `slug`, or else `load()`'s, which is
+        then cached. On a miss `author_of(slug)` gives the author's id, or
+        raises if there is no such article, before any version is created
+        for it; every version is read before `load` runs.
+        """
+        if not self.enabled:
+            return load()
+        keys = (self.key('generation'), self.key('article', slug))
+        generation, version = self.versions(*keys, create=False)
+        entry = None
+        if generation is not None and version is not None:
+            entry = self.backend.get(
+                self.key('fragment', generation, slug, version))
+        if entry is not None:
+            author_id = entry['author_id']
+        else:
+            author_id = author_of(slug)
+            generation, version = self.versions(*keys)
+        author_version = None
+        if author_id is not None:
+            author_version, = self.versions(self.key('author', author_id))
+        if entry is not None and entry['author_version'] == author_version:
+            self.count('hits')
+            return entry['data']
+
+        self.count('misses')
+        data = load()
+        self.backend.set(self.key('fragment', generation, slug, version), {
+            'author_id': author_id,
+            'author_version': author_version,
+            'data': data,
+        }, self.timeout)
+        return data
+
+    def article_changed(self, slug):
+        self.bump(self.key('article', slug))
+
+    def author_changed(self, user_id):
+        self.bump(self.key('author', user_id))
+
+    def clear(self):
+        """Retire every cached article at once"""
+        self.bump(self.key('generation'))
+
+    def stats(self):
+        """Hits and misses counted across every process sharing the cache"""
+        names = ('hits', 'misses')
+        counts = self.backend.get_many([self.key(name) for name in names])
+        return {name: counts.get(self.key(name), 0) for name in names}
+
+    def versions(self, *keys, create=True):
+        """
+        The current value of each version key. Missing ones are created,
+        or else read as None.
+        """
+        found = self.backend.get_many(keys)
+        for key in keys:
+            if key not in found and create:
+                self.backend.add(key, self.seed(), self.version_timeout)
+                found[key] = self.backend.get(key)
+        return [found.get(key) for key in keys]
+
+    def bump(self, key):
+        if not self.enabled:
+            return
+        self._incr(key)
+        transaction.on_commit(lambda: self._incr(key))
+
+    def count(self, name):
+        try:
+            self.backend.incr(self.key(name))
+        except ValueError:
+            self.backend.add(self.key(name), 1, None)
+
+    def _incr(self, key):
+        try:
+            self.backend.incr(key)
+        except ValueError:
+            # nothing is cached under a version that does not exist; the
+            # next read creates it afresh
+            pass
+
+    @staticmethod
+    def seed():
+        return int(time.time() * 1000000)
+
+
+article_cache = ArticleFragmentCache()
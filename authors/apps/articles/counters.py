@@ -0,0 +1,74 @@
+"""
+Recomputing the denormalized article, comment and rating counters, for
+`manage.py repair_counters` and the migrations that added them.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+
+from authors.apps.core.counters import count_of, repair, stamped
+
+from .models import RatingSummary
+
+
+def repair_all(article_model, comment_model, favorite_model):
+    """Repair every article and comment counter"""
+    articles = repair(article_model, {
+        'likes_count': count_of(
+            article_model.liked_by.through.objects, 'article'),
+        'dislikes_count': count_of(
+            article_model.disliked_by.through.objects, 'article'),
+        'favorites_count': count_of(favorite_model.objects, 'article'),
+        'comments_count': count_of(comment_model.objects, 'article'),
+    })
+    comments = repair(comment_model, {
+        'reply_count': count_of(comment_model.objects, 'parent'),
+    })
+    return articles, comments
+
+
+def rebuild_rating_summaries(rating_model, summary_model):
+    """
+    Recompute every article's rating summary from its ratings in one
+    grouped query, returning the number of summaries written.
+    """
+    fields = RatingSummary.STAR_FIELDS
+    buckets = {}
+    for stars, field in enumerate(fields, 1):
+        # mirror RatingSummary.star_field: round half up, clamp to 1..5
+        bounds = Q()
+        if stars > 1:
+            bounds &= Q(user_rating__gte=stars - 0.5)
+        if stars < len(fields):
+            bounds &= Q(user_rating__lt=stars + 0.5)
+        buckets[field] = Count('pk', filter=bounds)
+    rows = rating_model.objects.order_by().values('article').annotate(
+        total=Sum('user_rating'), count=Count('pk'), **buckets)
+    with transaction.atomic():
+        summary_model.objects.all().delete()
+        summary_model.objects.bulk_create(
+            summary_model(article_id=row.pop('article'), **row)
+            for row in rows)
+    return len(rows)
+
+
+def rebuild_average_ratings(article_model, summary_model):
+    """Copy every summary's rounded average onto its article"""
+    articles = defaultdict(list)
+    for article_id, total, count in summary_model.objects.values_list(
+            'article_id', 'total', 'count'):
+        articles[RatingSummary.rounded_average(total, count)].append(
+            article_id)
+    with transaction.atomic():
+        article_model.objects.exclude(
+            pk__in=summary_model.objects.values('article_id')
+        ).exclude(average_rating=0).update(
+            **stamped(article_model, average_rating=0))
+        # a few UPDATEs per distinct average rather than one per article
+        for average, pks in articles.items():
+            for start in range(0, len(pks), 500):
+                article_model.objects.filter(
+                    pk__in=pks[start:start + 500]
+                ).exclude(average_rating=average).update(
+                    **stamped(article_model, average_rating=average))
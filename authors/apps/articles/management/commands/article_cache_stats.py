@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from authors.apps.articles.cache import article_cache
+
+
+class Command(BaseCommand):
+    help = 'Report the hits and misses of the serialized article cache'
+
+    def handle(self, *args, **options):
+        stats = article_cache.stats()
+        lookups = stats['hits'] + stats['misses']
+        ratio = stats['hits'] / lookups if lookups else 0
+        self.stdout.write(f"{stats['hits']} hit(s), {stats['misses']} "
+                          f"miss(es), hit ratio {ratio:.1%}")
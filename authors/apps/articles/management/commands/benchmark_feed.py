@@ -0,0 +1,93 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from authors.apps.articles.models import Article, TimelineEntry
+from authors.apps.authentication.models import User
+
+PREFIX = 'feedbench'
+PAGE_SIZE = 20
+
+
+class Command(BaseCommand):
+    help = 'Compare the fan-out-on-read and fan-out-on-write feeds for ' \
+        'readers following many authors. Seeded rows are rolled back ' \
+        'afterwards.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--following', type=int, nargs='+', default=[10, 1000, 10000],
+            help='Numbers of followed authors to benchmark')
+        parser.add_argument('--articles-per-author', type=int, default=5)
+        parser.add_argument('--pages', type=int, default=50,
+                            help='First-page reads timed per strategy')
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'{"following":>10} {"read ms/page":>13} '
+                          f'{"write ms/page":>14} {"fan-out ms":>11}')
+        for count in options['following']:
+            with transaction.atomic():
+                reader, star = self.seed(
+                    count, options['articles_per_author'])
+                on_read = self.time_page(options['pages'], lambda: list(
+                    Article.objects.followed_by(reader)
+                    .order_by('-created_at', '-slug')[:PAGE_SIZE]))
+                on_write = self.time_page(options['pages'], lambda: list(
+                    Article.objects.in_bulk(list(
+                        TimelineEntry.objects.filter(user=reader)
+                        .order_by('-created_at', '-article_id')
+                        .values_list('article_id', flat=True)[:PAGE_SIZE]
+                    )).values()))
+                fan_out = self.time_fan_out(star)
+                transaction.set_rollback(True)
+            self.stdout.write(f'{count:>10} {on_read:>13.2f} '
+                              f'{on_write:>14.2f} {fan_out:>11.1f}')
+
+    @staticmethod
+    def seed(count, per_author):
+        """
+        A reader following `count` authors with `per_author` articles each,
+        their timeline filled in, and every author following a `star`
+        """
+        User.objects.bulk_create(
+            User(username=f'{PREFIX}{i}', email=f'{PREFIX}{i}@example.com')
+            for i in range(count + 2))
+        users = list(User.objects.filter(
+            username__startswith=PREFIX).order_by('id'))
+        reader, star, authors = users[0], users[1], users[2:]
+
+        Follow = User.following.through
+        Follow.objects.bulk_create(
+            Follow(from_user=reader, to_user=author) for author in authors)
+        Follow.objects.bulk_create(
+            Follow(from_user=author, to_user=star) for author in authors)
+
+        articles = [
+            Article(slug=f'{PREFIX}-{author.id}-{n}', title='benchmark',
+                    description='benchmark', body='benchmark',
+                    author=author)
+            for author in authors for n in range(per_author)]
+        Article.objects.bulk_create(articles)
+        TimelineEntry.objects.bulk_create(
+            TimelineEntry(user=reader, article=article,
+                          created_at=article.created_at)
+            for article in articles)
+        return reader, star
+
+    @staticmethod
+    def time_page(pages, read):
+        started = time.perf_counter()
+        for _ in range(pages):
+            read()
+        return (time.perf_counter() - started) / pages * 1000
+
+    @staticmethod
+    def time_fan_out(star):
+        """Milliseconds to write one article into every follower's feed"""
+        article = Article.objects.create(
+            title='benchmark', description='benchmark', body='benchmark',
+            author=star)
+        started = time.perf_counter()
+        TimelineEntry.fan_out(article)
+        return (time.perf_counter() - started) * 1000
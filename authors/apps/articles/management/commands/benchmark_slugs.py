@@ -0,0 +1,55 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from authors.apps.articles.models import Article, SlugSequence
+from authors.apps.authentication.models import User
+
+TITLE = 'slug benchmark'
+USERNAME = 'slugbench'
+
+
+class Command(BaseCommand):
+    help = 'Create many articles sharing one title from concurrent ' \
+        'threads and report creates/sec. Needs a database that allows ' \
+        'concurrent writers; created rows are deleted afterwards.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--articles', type=int, default=10000)
+        parser.add_argument('--threads', type=int, default=8)
+
+    def handle(self, *args, **options):
+        count, threads = options['articles'], options['threads']
+        author, _ = User.objects.get_or_create(
+            username=USERNAME, email=f'{USERNAME}@example.com')
+        try:
+            start = time.perf_counter()
+            with ThreadPoolExecutor(threads) as pool:
+                created = sum(pool.map(
+                    lambda share: self.create(author, share),
+                    [count // threads + (i < count % threads)
+                     for i in range(threads)]))
+            elapsed = time.perf_counter() - start
+            slugs = Article.objects.filter(author=author).values_list(
+                'slug', flat=True)
+            self.stdout.write(
+                f'{created} articles in {elapsed:.2f}s '
+                f'({created / elapsed:,.0f}/s), '
+                f'{len(set(slugs))} distinct slugs')
+        finally:
+            author.delete()
+            SlugSequence.objects.filter(base__startswith='slug-benchmark') \
+                .delete()
+
+    @staticmethod
+    def create(author, count):
+        try:
+            for _ in range(count):
+                Article.objects.create(
+                    title=TITLE, description='benchmark', body='benchmark',
+                    author=author)
+            return count
+        finally:
+            connection.close()
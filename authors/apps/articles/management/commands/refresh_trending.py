@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from authors.apps.articles.trending import refresh
+
+
+class Command(BaseCommand):
+    help = 'Fold the likes, favorites, ratings and comments logged since ' \
+        'the last run into the trending scores. Schedule it every few ' \
+        'minutes.'
+
+    def handle(self, *args, **options):
+        top = refresh()
+        self.stdout.write(f'Refreshed trending scores; {len(top)} '
+                          f'article(s) trending')
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from authors.apps.articles.cache import article_cache
+from authors.apps.articles.counters import (
+    rebuild_average_ratings, rebuild_rating_summaries, repair_all)
+from authors.apps.articles.models import (
+    Article, Comment, Favorite, Rating, RatingSummary)
+
+
+class Command(BaseCommand):
+    help = 'Recompute the denormalized article, comment and rating ' \
+        'counters'
+
+    def handle(self, *args, **options):
+        articles, comments = repair_all(Article, Comment, Favorite)
+        summaries = rebuild_rating_summaries(Rating, RatingSummary)
+        rebuild_average_ratings(Article, RatingSummary)
+        article_cache.clear()
+        self.stdout.write(
+            f'Repaired {articles} article(s) and {comments} comment(s), '
+            f'rebuilt {summaries} rating summaries')
@@ -0,0 +1,17 @@
+# Generated by Django 2.1.5 on 2026-10-18 10:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['created_at', 'slug'], name='articles_ar_created_719a91_idx'),
+        ),
+    ]
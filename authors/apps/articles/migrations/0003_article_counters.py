@@ -0,0 +1,47 @@
+# Generated by Django 2.1.5 on 2026-10-18 11:00
+
+from django.db import migrations, models
+
+from authors.apps.articles.counters import repair_all
+
+
+def backfill_counters(apps, schema_editor):
+    repair_all(apps.get_model('articles', 'Article'),
+               apps.get_model('articles', 'Comment'),
+               apps.get_model('articles', 'Favorite'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0002_article_created_at_slug_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='comments_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='dislikes_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='favorites_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='likes_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='reply_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 2.1.5 on 2026-10-18 11:02
+
+import authors.apps.core.models
+from django.db import migrations, models
+import django.db.models.deletion
+
+from authors.apps.articles.counters import rebuild_rating_summaries
+
+
+def backfill_summaries(apps, schema_editor):
+    rebuild_rating_summaries(apps.get_model('articles', 'Rating'),
+                             apps.get_model('articles', 'RatingSummary'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0003_article_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RatingSummary',
+            fields=[
+                ('article', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='rating_summary', serialize=False, to='articles.Article')),
+                ('total', models.FloatField(default=0)),
+                ('count', models.IntegerField(default=0)),
+                ('one_star', models.IntegerField(default=0)),
+                ('two_stars', models.IntegerField(default=0)),
+                ('three_stars', models.IntegerField(default=0)),
+                ('four_stars', models.IntegerField(default=0)),
+                ('five_stars', models.IntegerField(default=0)),
+            ],
+            bases=(authors.apps.core.models.CounterMixin, models.Model),
+        ),
+        migrations.RunPython(backfill_summaries, migrations.RunPython.noop),
+    ]
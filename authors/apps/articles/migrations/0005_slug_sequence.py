@@ -0,0 +1,20 @@
+# Generated by Django 2.1.5 on 2026-10-18 11:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0004_rating_summary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlugSequence',
+            fields=[
+                ('base', models.CharField(max_length=1000, primary_key=True, serialize=False)),
+                ('last', models.IntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 2.1.5 on 2026-10-18 11:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0005_slug_sequence'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['article', 'parent', 'created_at'], name='articles_co_article_5a21f8_idx'),
+        ),
+    ]
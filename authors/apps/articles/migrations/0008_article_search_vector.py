@@ -0,0 +1,70 @@
+# Generated by Django 2.1.5 on 2026-10-18 11:40
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+# The vector weighs titles above descriptions above bodies. A trigger keeps
+# it current however a row is written, bulk operations included.
+CREATE_SEARCH = [
+    '''
+    CREATE FUNCTION articles_article_search_vector_update() RETURNS trigger
+    AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') ||
+            setweight(to_tsvector('english',
+                                  coalesce(NEW.description, '')), 'B') ||
+            setweight(to_tsvector('english', coalesce(NEW.body, '')), 'C');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    ''',
+    '''
+    CREATE TRIGGER articles_article_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, description, body
+    ON articles_article
+    FOR EACH ROW EXECUTE PROCEDURE articles_article_search_vector_update()
+    ''',
+    # fires the trigger for the existing rows
+    'UPDATE articles_article SET title = title',
+    '''
+    CREATE INDEX articles_article_search_vector_idx
+    ON articles_article USING gin (search_vector)
+    ''',
+]
+
+DROP_SEARCH = [
+    'DROP INDEX IF EXISTS articles_article_search_vector_idx',
+    'DROP TRIGGER IF EXISTS articles_article_search_vector_trigger '
+    'ON articles_article',
+    'DROP FUNCTION IF EXISTS articles_article_search_vector_update()',
+]
+
+
+def run_on_postgres(statements):
+    """
+    Run `statements` on PostgreSQL only; other databases search through
+    the in-memory index instead
+    """
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor == 'postgresql':
+            for statement in statements:
+                schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0007_following_feed'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(run_on_postgres(CREATE_SEARCH),
+                             run_on_postgres(DROP_SEARCH)),
+    ]
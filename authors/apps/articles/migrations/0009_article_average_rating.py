@@ -0,0 +1,43 @@
+# Generated by Django 2.1.5 on 2026-10-18 11:30
+
+from django.db import migrations, models
+
+from authors.apps.articles.counters import rebuild_average_ratings
+
+
+def backfill_average_ratings(apps, schema_editor):
+    rebuild_average_ratings(apps.get_model('articles', 'Article'),
+                            apps.get_model('articles', 'RatingSummary'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0008_article_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='average_rating',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=3),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['updated_at', 'slug'], name='articles_ar_updated_56b20c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['likes_count', 'slug'], name='articles_ar_likes_c_26e44b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['favorites_count', 'slug'], name='articles_ar_favorit_d41427_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['average_rating', 'slug'], name='articles_ar_average_8abace_idx'),
+        ),
+        migrations.RunPython(backfill_average_ratings,
+                             migrations.RunPython.noop),
+    ]
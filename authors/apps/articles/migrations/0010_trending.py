@@ -0,0 +1,41 @@
+# Generated by Django 2.1.5 on 2026-10-18 11:33
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0009_article_average_rating'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrendingActivity',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('like', 'Like'), ('favorite', 'Favorite'), ('rating', 'Rating'), ('comment', 'Comment')], max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='TrendingRun',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ran_at', models.DateTimeField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='TrendingScore',
+            fields=[
+                ('article', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='trending_score', serialize=False, to='articles.Article')),
+                ('score', models.FloatField(db_index=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='trendingactivity',
+            name='article',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='trending_activity', to='articles.Article'),
+        ),
+    ]
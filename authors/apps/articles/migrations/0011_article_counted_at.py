@@ -0,0 +1,19 @@
+# Generated by Django 2.1.5 on 2026-10-18 11:37
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0010_trending'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='counted_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
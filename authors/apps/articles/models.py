@@ -1,20 +1,100 @@
-import os
-from django.db import models
+import re
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchVectorField
+from django.db import IntegrityError, models, transaction
+from django.db.models import (BooleanField, Exists, F, OuterRef, Prefetch, Q,
+                              Subquery, Value)
+from django.utils import timezone
 from django.utils.text import slugify
 
 from authors.apps.authentication.models import User
+from authors.apps.core.models import CounterMixin
 from cloudinary.models import CloudinaryField
-from django.db.models.signals import post_save
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.dispatch import receiver
-from notifications.signals import notify
 
-from django.utils.http import urlsafe_base64_encode
-from django.utils.encoding import force_bytes
-from django.core.mail import send_mail
-from django.template.loader import render_to_string
+from authors.apps.notify.models import FanoutJob
+
+from .cache import article_cache
+from .search import memory_search
+
+
+class ArticleQuerySet(models.QuerySet):
+    """Query helpers for articles"""
+
+    def for_serializer(self, user=None, fields=None):
+        """
+        Load everything `ArticleSerializer` reads in a fixed number of
+        queries, however many articles are serialized: the like/dislike
+        relations are prefetched and the viewer's like state is annotated
+        on every row. Authors come from the author summary cache.
+
+        When `fields` names the serialized fields, only what they need is
+        loaded.
+        """
+        def wanted(name):
+            return fields is None or name in fields
+
+        ids_only = User.objects.only('id')
+        queryset = self
+        for relation in ('liked_by', 'disliked_by'):
+            if wanted(relation):
+                queryset = queryset.prefetch_related(
+                    Prefetch(relation, queryset=ids_only))
+        if wanted('like_status'):
+            queryset = queryset.annotate(
+                viewer_liked=self._viewer_state(Article.liked_by, user))
+        if wanted('dislike_status'):
+            queryset = queryset.annotate(
+                viewer_disliked=self._viewer_state(Article.disliked_by, user))
+        return queryset
+
+    def viewer_state(self, user):
+        """`like_status` and `dislike_status` rows of `user` per article"""
+        return self.annotate(
+            like_status=self._viewer_state(Article.liked_by, user),
+            dislike_status=self._viewer_state(Article.disliked_by, user),
+        ).values('like_status', 'dislike_status')
+
+    def filter_by(self, author=None, created_after=None, created_before=None,
+                  updated_after=None, updated_before=None, min_rating=None):
+        """Narrow the list by the optional filters of `ArticleFilter`"""
+        queryset = self
+        if author:
+            queryset = queryset.filter(author_id__in=User.objects.filter(
+                username=author).values('id'))
+        ranges = {
+            'created_at__gte': created_after,
+            'created_at__lte': created_before,
+            'updated_at__gte': updated_after,
+            'updated_at__lte': updated_before,
+            'average_rating__gte': min_rating,
+        }
+        return queryset.filter(**{lookup: value for lookup, value
+                                  in ranges.items() if value is not None})
+
+    def followed_by(self, user):
+        """Articles by the authors `user` follows (fan-out on read)"""
+        return self.filter(author_id__in=user.following.values('id'))
+
+    @staticmethod
+    def _viewer_state(relation, user):
+        if user is None or not user.is_authenticated:
+            return Value(False, output_field=BooleanField())
+        return Exists(relation.through.objects.filter(
+            article_id=OuterRef('pk'), user_id=user.id))
+
+
+class ArticleManager(models.Manager.from_queryset(ArticleQuerySet)):
+    """Leaves the search vector out of every article loaded"""
 
+    def get_queryset(self):
+        return super().get_queryset().defer('search_vector')
 
-class Article(models.Model):
+
+class Article(CounterMixin, models.Model):
     """Create models for the articles"""
     title = models.CharField(max_length=50, blank=False)
     description = models.CharField(max_length=400, blank=False)
@@ -31,26 +111,125 @@ class Article(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Weighted tsvector of title, description and body, maintained by a
+    # database trigger on PostgreSQL and unused elsewhere
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    # Denormalized counters, kept in step by the views that change the
+    # underlying rows. `manage.py repair_counters` recomputes them.
+    likes_count = models.IntegerField(default=0)
+    dislikes_count = models.IntegerField(default=0)
+    favorites_count = models.IntegerField(default=0)
+    comments_count = models.IntegerField(default=0)
+    # RatingSummary.average, rounded, so articles filter and sort on it
+    average_rating = models.DecimalField(
+        max_digits=3, decimal_places=2, default=0)
+    # When any of the counters above last changed
+    counted_at = models.DateTimeField(default=timezone.now)
+
+    objects = ArticleManager()
+    counter_fields = ('likes_count', 'dislikes_count', 'favorites_count',
+                      'comments_count', 'average_rating')
+    counted_at_field = 'counted_at'
+
+    class Meta:
+        indexes = [
+            # keyset pagination seeks on this pair
+            models.Index(fields=['created_at', 'slug']),
+            # the following feed reads each followed author's range
+            models.Index(fields=['author', 'created_at', 'slug']),
+            # the list's other sort orders
+            models.Index(fields=['updated_at', 'slug']),
+            models.Index(fields=['likes_count', 'slug']),
+            models.Index(fields=['favorites_count', 'slug']),
+            models.Index(fields=['average_rating', 'slug']),
+        ]
+
     def __str__(self):
         return self.title
 
+    def counters_changed(self):
+        article_cache.article_changed(self.pk)
+
+    # Attempts at inserting under a fresh slug before giving up
+    slug_attempts = 5
+
     def generate_slug(self):
         """generating a slug for the title of the article
-            eg: this-is-an-article"""
-        slug = slugify(self.title)
-        new_slug = slug
-        s = 1
-        while Article.objects.filter(slug=new_slug).exists():
-            """increase value of slug by one"""
-            new_slug = f'{slug}-{s}'
-            s += 1
-        return new_slug
+            eg: this-is-an-article, then this-is-an-article-1"""
+        return SlugSequence.allocate(slugify(self.title))
 
     def save(self, *args, **kwargs):
         """create an article and save to the database"""
-        if not self.slug:
+        if self.slug:
+            return super().save(*args, **kwargs)
+
+        # A slug taken by a title that slugifies to `base-N` collides with
+        # the sequence of `base`, so retry the insert with the next suffix.
+        kwargs['force_insert'] = True
+        for attempt in range(self.slug_attempts):
             self.slug = self.generate_slug()
-        super().save(*args, **kwargs)
+            try:
+                with transaction.atomic():
+                    return super().save(*args, **kwargs)
+            except IntegrityError:
+                # anything but the slug being taken fails at once
+                taken = type(self)._default_manager.filter(
+                    slug=self.slug).exists()
+                self.slug = ''
+                if not taken or attempt == self.slug_attempts - 1:
+                    raise
+
+
+class SlugSequence(models.Model):
+    """
+    The last suffix handed out for each slugified title, so that the next
+    free slug is found with a single row update however many articles
+    share a title
+    """
+    base = models.CharField(max_length=1000, primary_key=True)
+    last = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f'{self.base}-{self.last}'
+
+    @staticmethod
+    def format(base, suffix):
+        return f'{base}-{suffix}' if suffix else base
+
+    @classmethod
+    def allocate(cls, base):
+        """Reserve and return the next slug for `base`"""
+        for _ in range(2):
+            with transaction.atomic():
+                # The row lock taken by UPDATE serializes concurrent
+                # allocations for the same base until this block commits.
+                if cls.objects.filter(base=base).update(last=F('last') + 1):
+                    last = cls.objects.filter(base=base).values_list(
+                        'last', flat=True).get()
+                    return cls.format(base, last)
+            try:
+                with transaction.atomic():
+                    suffix = cls.next_free_suffix(base)
+                    cls.objects.create(base=base, last=suffix)
+                    return cls.format(base, suffix)
+            except IntegrityError:
+                # another request seeded the sequence first; bump it
+                continue
+        raise IntegrityError(f'Could not allocate a slug for {base!r}')
+
+    @staticmethod
+    def next_free_suffix(base):
+        """
+        Seed a sequence from the slugs already taken, for titles used
+        before sequences were kept
+        """
+        numbered = Q(slug__startswith=f'{base}-',
+                     slug__regex=rf'^{re.escape(base)}-[0-9]+$')
+        taken = Article.objects.filter(Q(slug=base) | numbered) \
+            .values_list('slug', flat=True)
+        suffixes = [int(slug[len(base) + 1:] or 0) for slug in taken]
+        return max(suffixes) + 1 if suffixes else 0
 
 
 class Rating(models.Model):
@@ -71,7 +250,115 @@ class Rating(models.Model):
         return self.user_rating
 
 
-class Comment(models.Model):
+class RatingSummary(CounterMixin, models.Model):
+    """
+    Running aggregate of an article's ratings.
+
+    Updated in the same transaction as the rating it summarises so reading
+    an article's average never has to scan the rating table.
+    """
+    STAR_FIELDS = ('one_star', 'two_stars', 'three_stars',
+                   'four_stars', 'five_stars')
+
+    article = models.OneToOneField(
+        Article,
+        related_name="rating_summary",
+        on_delete=models.CASCADE,
+        primary_key=True
+    )
+    total = models.FloatField(default=0)
+    count = models.IntegerField(default=0)
+    one_star = models.IntegerField(default=0)
+    two_stars = models.IntegerField(default=0)
+    three_stars = models.IntegerField(default=0)
+    four_stars = models.IntegerField(default=0)
+    five_stars = models.IntegerField(default=0)
+
+    counter_fields = ('total', 'count') + STAR_FIELDS
+
+    @property
+    def average(self):
+        return self.total / self.count if self.count else 0
+
+    @staticmethod
+    def rounded_average(total, count):
+        """The average as stored on `Article.average_rating`"""
+        if not count:
+            return Decimal(0)
+        return Decimal(total / count).quantize(
+            Decimal('0.01'), rounding=ROUND_HALF_UP)
+
+    @property
+    def histogram(self):
+        return {str(stars): getattr(self, field)
+                for stars, field in enumerate(self.STAR_FIELDS, 1)}
+
+    @classmethod
+    def star_field(cls, rating):
+        """The histogram column a rating falls into, rounded to a star"""
+        stars = min(max(int(rating + 0.5), 1), len(cls.STAR_FIELDS))
+        return cls.STAR_FIELDS[stars - 1]
+
+    @classmethod
+    def of(cls, article):
+        """The article's summary, or an empty one if it was never rated"""
+        try:
+            return article.rating_summary
+        except cls.DoesNotExist:
+            return cls(article=article)
+
+    @classmethod
+    def record(cls, article, rating, previous=None):
+        """
+        Fold a new rating, or a change from `previous` to `rating`, into the
+        article's summary. Call inside the transaction saving the rating.
+        """
+        summary, _ = cls.objects.get_or_create(article=article)
+        deltas = {'total': rating - (previous or 0), 'count': 0}
+        if previous is None:
+            deltas['count'] = 1
+        else:
+            field = cls.star_field(previous)
+            deltas[field] = deltas.get(field, 0) - 1
+        field = cls.star_field(rating)
+        deltas[field] = deltas.get(field, 0) + 1
+        summary.adjust_counters(**deltas)
+        # The UPDATE above locks the summary until the transaction ends,
+        # so the totals read back cannot be overtaken by another rating.
+        summary.refresh_from_db(fields=['total', 'count'])
+        Article.objects.filter(pk=article.pk).update(
+            average_rating=cls.rounded_average(summary.total, summary.count),
+            counted_at=timezone.now())
+        article_cache.article_changed(article.pk)
+        return summary
+
+
+class CommentQuerySet(models.QuerySet):
+    """Query helpers for comments"""
+
+    def threads(self, replies=None):
+        """
+        Top-level comments with their authors and first `replies` replies
+        (all of them when None) joined or prefetched into `.replies`, so
+        that a page of threads costs two queries
+        """
+        inline = Comment.objects.select_related('author') \
+            .order_by('created_at', 'id')
+        if replies is not None:
+            # Django cannot slice a prefetch, so keep the first few replies
+            # of each parent with a correlated LIMIT subquery instead. It
+            # reads the parent's range of the (article, parent, created_at)
+            # index, so each reply costs a seek rather than a scan.
+            first = Comment.objects.filter(
+                article=OuterRef('article'), parent=OuterRef('parent')
+            ).order_by('created_at', 'id').values('id')[:replies]
+            inline = inline.filter(id__in=Subquery(first))
+        return self.filter(parent=None).select_related('author') \
+            .prefetch_related(
+                Prefetch('children', queryset=inline, to_attr='replies'))
+
+
+class Comment(CounterMixin, models.Model):
     """
     This class creates a model for article comments
 
@@ -99,9 +386,19 @@ class Comment(models.Model):
         null=True,
         default=None
     )
+    reply_count = models.IntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = CommentQuerySet.as_manager()
+    counter_fields = ('reply_count',)
+
+    class Meta:
+        indexes = [
+            # threads and their replies are read as ranges of this index
+            models.Index(fields=['article', 'parent', 'created_at']),
+        ]
+
     def __str__(self):
         """Return a human readable version of model objects"""
         return self.body
@@ -118,40 +415,188 @@ class Favorite(models.Model):
         User, related_name="favoriter", on_delete=models.CASCADE)
 
 
+class TimelineEntry(models.Model):
+    """
+    An article in the feed of one of its author's followers.
+
+    Written when the article is published (fan-out on write) so that a
+    feed page is a range read of one index whoever the reader follows.
+    Only kept while ARTICLE_FEED_STRATEGY is 'write'.
+    """
+    user = models.ForeignKey(
+        User, related_name='timeline', on_delete=models.CASCADE)
+    article = models.ForeignKey(
+        Article, related_name='timeline_entries', on_delete=models.CASCADE)
+    # the article's, copied so that the feed is ordered without a join
+    created_at = models.DateTimeField()
+
+    # Recent articles of an author copied into a new follower's feed
+    backfill_size = 100
+
+    class Meta:
+        unique_together = ('user', 'article')
+        indexes = [
+            models.Index(fields=['user', 'created_at', 'article']),
+        ]
+
+    def __str__(self):
+        return f'{self.user_id}: {self.article_id}'
+
+    @classmethod
+    def fan_out(cls, article, chunk_size=1000):
+        """Add `article` to the feed of every follower of its author"""
+        followers = article.author.followers.order_by('id') \
+            .values_list('id', flat=True)
+        with transaction.atomic():
+            # rewriting the whole set keeps a retried fan-out idempotent
+            cls.objects.filter(article=article).delete()
+            last_id = 0
+            while True:
+                chunk = list(followers.filter(id__gt=last_id)[:chunk_size])
+                if not chunk:
+                    break
+                cls.objects.bulk_create(
+                    cls(user_id=user_id, article=article,
+                        created_at=article.created_at)
+                    for user_id in chunk)
+                last_id = chunk[-1]
+
+    @classmethod
+    def follow(cls, user_id, author_ids):
+        """Copy the recent articles of newly followed authors"""
+        for author_id in author_ids:
+            articles = Article.objects.filter(author_id=author_id).exclude(
+                timeline_entries__user_id=user_id).order_by('-created_at') \
+                .values_list('slug', 'created_at')[:cls.backfill_size]
+            cls.objects.bulk_create(
+                cls(user_id=user_id, article_id=slug, created_at=created_at)
+                for slug, created_at in articles)
+
+    @classmethod
+    def unfollow(cls, user_id, author_ids):
+        """Drop the articles of unfollowed authors from a feed"""
+        cls.objects.filter(
+            user_id=user_id, article__author_id__in=author_ids).delete()
+
+
+class TrendingActivity(models.Model):
+    """
+    A like, favorite, rating or comment not yet folded into the trending
+    scores. `manage.py refresh_trending` folds and then deletes them.
+    """
+    LIKE = 'like'
+    FAVORITE = 'favorite'
+    RATING = 'rating'
+    COMMENT = 'comment'
+    KINDS = ((LIKE, 'Like'), (FAVORITE, 'Favorite'), (RATING, 'Rating'),
+             (COMMENT, 'Comment'))
+
+    article = models.ForeignKey(
+        Article, related_name='trending_activity', on_delete=models.CASCADE)
+    kind = models.CharField(max_length=10, choices=KINDS)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f'{self.kind} of {self.article_id}'
+
+
+class TrendingScore(models.Model):
+    """An article's time-decayed activity score as of the last refresh"""
+    article = models.OneToOneField(
+        Article, related_name='trending_score', on_delete=models.CASCADE,
+        primary_key=True)
+    score = models.FloatField(db_index=True)
+
+    def __str__(self):
+        return f'{self.article_id}: {self.score}'
+
+
+class TrendingRun(models.Model):
+    """When the trending scores were last refreshed; a single row"""
+    ran_at = models.DateTimeField()
+
+    def __str__(self):
+        return str(self.ran_at)
+
+
 @receiver(post_save, sender=Article)
 def send_notifications_to_all_users(sender,
                                     instance,
                                     created, *args, **kwargs):
-    """Create a Signal that sends email to all users that follow the author.
+    """Queue the notification of all users that follow the author.
+    The followers are e-mailed and notified in the background by
+    `manage.py notification_worker`, so publishing does not wait on them.
      Arguments:
         sender {[type]} -- [Instance of ]
         created {[type]} -- [If the article is posted.]
     """
 
     if instance and created:
-        users_followers = instance.author.followers.all()
-
-        link = f"""{os.getenv("HEROKU_BACKEND_URL")}/articles/\n"""
-        f"""{instance.slug}"""
-        for user in users_followers:
-            if user.get_notifications:
-                uuid = urlsafe_base64_encode(force_bytes(user)
-                                             ).decode("utf-8")
-                subscription = f'{os.getenv("HEROKU_BACKEND_URL")}/api/' +\
-                    'v1/users/' +\
-                    f'unsubscribe/{uuid}/'
-                sender = os.getenv('EMAIL_HOST_USER')
-                email = user.email
-                email_subject = "Author's Haven Email Notification"
-                message = render_to_string('create_article.html', {
-                    'title': email_subject,
-                    'username': user.username,
-                    'link': link,
-                    'subscription': subscription
-                })
-
-                send_mail(email_subject, '', sender, [
-                    email, ], html_message=message)
-                notify.send(instance.author, recipient=user,
-                            verb='A user you follow has a new post',
-                            action_object=instance)
+        FanoutJob.objects.create(article=instance)
+
+
+@receiver(post_save, sender=Article)
+def index_article(sender, instance, **kwargs):
+    """Keep the in-memory search index of non-PostgreSQL databases fresh"""
+    memory_search.update(instance)
+
+
+@receiver(post_delete, sender=Article)
+def unindex_article(sender, instance, **kwargs):
+    memory_search.remove(instance.slug)
+
+
+@receiver(post_save, sender=Article)
+@receiver(post_delete, sender=Article)
+def expire_cached_article(sender, instance, **kwargs):
+    article_cache.article_changed(instance.pk)
+
+
+@receiver(post_save, sender=User)
+def expire_cached_author(sender, instance, **kwargs):
+    """Articles show their author's profile"""
+    article_cache.author_changed(instance.pk)
+
+
+@receiver(m2m_changed, sender=User.following.through)
+def expire_cached_follows(sender, instance, action, pk_set, **kwargs):
+    """Articles show their author's follow lists"""
+    if action not in ('post_add', 'post_remove') or not pk_set:
+        return
+    for user_id in {instance.pk, *pk_set}:
+        article_cache.author_changed(user_id)
+
+
+@receiver(m2m_changed, sender=User.following.through)
+def sync_timelines(sender, instance, action, reverse, pk_set, **kwargs):
+    """Keep precomputed feeds in step with follows and unfollows"""
+    if settings.ARTICLE_FEED_STRATEGY != 'write' or not pk_set:
+        return
+    if action not in ('post_add', 'post_remove'):
+        return
+    # `reverse` is set when the change is made through `followers`
+    pairs = [(pk, [instance.pk]) for pk in pk_set] if reverse \
+        else [(instance.pk, pk_set)]
+    for user_id, author_ids in pairs:
+        if action == 'post_add':
+            TimelineEntry.follow(user_id, author_ids)
+        else:
+            TimelineEntry.unfollow(user_id, author_ids)
+
+
+@receiver(post_save, sender=Favorite)
+@receiver(post_save, sender=Rating)
+@receiver(post_save, sender=Comment)
+def record_trending_activity(sender, instance, created, **kwargs):
+    """
+    Log new activity for the next trending refresh. Likes are logged by
+    the view, as saving the auto-created through model sends no signal.
+    """
+    if not created:
+        return
+    kind = {
+        Favorite: TrendingActivity.FAVORITE,
+        Rating: TrendingActivity.RATING,
+        Comment: TrendingActivity.COMMENT,
+    }[sender]
+    TrendingActivity.objects.create(article_id=instance.article_id, kind=kind)
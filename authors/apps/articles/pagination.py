@@ -0,0 +1,63 @@
+from authors.apps.core.pagination import KeysetPagination
+
+
+class ArticleCursorPagination(KeysetPagination):
+    """Pages through articles oldest first, seeking on (created_at, slug)"""
+    ordering = ('created_at', 'slug')
+    results_key = 'Articles'
+    # The orders `?sort=` picks from, each backed by an index
+    sort_orderings = {
+        'recent': ('-created_at', '-slug'),
+        'updated': ('-updated_at', '-slug'),
+        'likes': ('-likes_count', '-slug'),
+        'favorites': ('-favorites_count', '-slug'),
+        'rating': ('-average_rating', '-slug'),
+    }
+
+    def __init__(self, sort=None):
+        if sort is not None:
+            self.ordering = self.sort_orderings[sort]
+
+
+class FeedCursorPagination(KeysetPagination):
+    """Pages through a following feed, newest article first"""
+    ordering = ('-created_at', '-slug')
+    results_key = 'Articles'
+
+
+class TimelineCursorPagination(KeysetPagination):
+    """Pages through a precomputed timeline, newest article first"""
+    ordering = ('-created_at', '-article_id')
+    results_key = 'Articles'
+
+
+class SearchCursorPagination(KeysetPagination):
+    """Pages through search results, most relevant first"""
+    ordering = ('-search_score', '-slug')
+    results_key = 'Articles'
+
+
+class CommentCursorPagination(KeysetPagination):
+    """Pages through an article's threads, newest top-level comment first"""
+    ordering = ('-created_at', '-id')
+    results_key = 'Comments'
+
+
+class ReplyCursorPagination(KeysetPagination):
+    """Pages through the replies to a comment, oldest first"""
+    ordering = ('created_at', 'id')
+    cursor_query_param = 'replies_cursor'
+
+    def __init__(self, page_size=None):
+        if page_size is not None:
+            self.page_size = page_size
+
+    def link_after(self, base_url, reply=None):
+        """
+        The link to the page of replies that follows `reply`, or to the
+        first page when None
+        """
+        if reply is None:
+            return base_url
+        self.base_url = base_url
+        return self.encode_cursor(reply, reverse=False)
@@ -9,6 +9,7 @@ class ArticleJsonRenderer(renderers.BaseRenderer):
     media_type = 'application/json'
     format = 'json'
     charset = 'utf-8'
+    pagination_keys = ('next', 'previous')
 
     def render(self, data, valid_media_type=None, renderer_context=None):
         """render a list of articles"""
@@ -23,6 +24,14 @@ class ArticleJsonRenderer(renderers.BaseRenderer):
             if error:
                 return json.dumps({'message': data})
 
+            # paginated lists carry their cursors beside the envelope
+            links = {key: data[key] for key in self.pagination_keys
+                     if key in data}
+            if links:
+                data = {key: value for key, value in data.items()
+                        if key not in links}
+                return json.dumps({'article': data, **links})
+
             return json.dumps({'article': data})
 
 
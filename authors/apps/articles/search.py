@@ -0,0 +1,175 @@
+"""
+Full-text search over article titles, descriptions and bodies.
+
+On PostgreSQL articles are matched against `Article.search_vector`, a
+weighted tsvector kept up to date by a trigger and read through a GIN
+index. Other databases, such as the SQLite used for offline test runs,
+fall back to an inverted index held in memory.
+"""
+import re
+import threading
+from collections import defaultdict
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connection
+from django.db.models import (Case, F, Func, IntegerField, TextField, Value,
+                              When)
+from django.db.models.functions import Cast
+from django.utils.html import escape
+
+SEARCH_CONFIG = 'english'
+# Relevance is stored as an integer so that keyset cursors compare it
+# exactly; floats do not survive the round trip through a cursor.
+SCORE_SCALE = 1000000
+# PostgreSQL's default weights for the A, B and C ranked fields
+WEIGHTS = (('title', 1.0), ('description', 0.4), ('body', 0.2))
+SNIPPET_WORDS = 30
+HIGHLIGHT = ('<mark>', '</mark>')
+# ts_headline marks matches with these, to be swapped for HIGHLIGHT once
+# the rest of the snippet has been escaped
+SENTINELS = ('\x02', '\x03')
+
+
+class PostgresSearch:
+    """Ranks and highlights with the tsvector column and ts_headline"""
+
+    def search(self, queryset, terms):
+        query = SearchQuery(terms, config=SEARCH_CONFIG)
+        return queryset.filter(search_vector=query).annotate(
+            search_score=Cast(
+                SearchRank(F('search_vector'), query) * SCORE_SCALE,
+                IntegerField()))
+
+    def highlight(self, articles, terms):
+        if not articles:
+            return
+        headline = Func(
+            Value(SEARCH_CONFIG), F('body'),
+            SearchQuery(terms, config=SEARCH_CONFIG),
+            Value(f'StartSel={SENTINELS[0]}, StopSel={SENTINELS[1]}, '
+                  f'MaxWords={SNIPPET_WORDS}, MinWords=10'),
+            function='ts_headline', output_field=TextField())
+        snippets = dict(type(articles[0])._default_manager.filter(
+            pk__in=[article.pk for article in articles]
+        ).annotate(snippet=headline).values_list('slug', 'snippet'))
+        for article in articles:
+            article.snippet = escape(snippets.get(article.pk, '')).replace(
+                SENTINELS[0], HIGHLIGHT[0]).replace(SENTINELS[1], HIGHLIGHT[1])
+
+
+class MemorySearch:
+    """
+    An inverted index of article words held in memory.
+
+    Built from the database on first use and then kept in step by the
+    article save and delete signals. Matches need every query word, like
+    PostgreSQL's plainto_tsquery, but words are not stemmed.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.postings = None
+        self.documents = {}
+
+    def search(self, queryset, terms):
+        scores = self.scores(queryset.model, terms)
+        if not scores:
+            return queryset.none().annotate(
+                search_score=Value(0, output_field=IntegerField()))
+        return queryset.filter(slug__in=scores).annotate(
+            search_score=Case(
+                *[When(slug=slug, then=Value(score))
+                  for slug, score in scores.items()],
+                output_field=IntegerField()))
+
+    def scores(self, model, terms):
+        """Relevance of every article containing all words of `terms`"""
+        words = set(tokenize(terms))
+        if not words:
+            return {}
+        with self.lock:
+            self.build(model)
+            matches = [self.postings.get(word, {}) for word in words]
+            slugs = set.intersection(*(set(match) for match in matches))
+            return {slug: int(sum(match[slug] for match in matches) *
+                              SCORE_SCALE / len(words))
+                    for slug in slugs}
+
+    def highlight(self, articles, terms):
+        words = set(tokenize(terms))
+        for article in articles:
+            article.snippet = snippet(article.body, words)
+
+    def build(self, model):
+        """Index every article, unless already done. Needs the lock."""
+        if self.postings is not None:
+            return
+        self.postings = defaultdict(dict)
+        self.documents = {}
+        for article in model._default_manager.values(
+                'slug', *(field for field, _ in WEIGHTS)):
+            self._add(article['slug'], article)
+
+    def update(self, article):
+        with self.lock:
+            if self.postings is None:
+                return
+            self._remove(article.slug)
+            self._add(article.slug, {field: getattr(article, field)
+                                     for field, _ in WEIGHTS})
+
+    def remove(self, slug):
+        with self.lock:
+            if self.postings is not None:
+                self._remove(slug)
+
+    def clear(self):
+        with self.lock:
+            self.postings = None
+            self.documents = {}
+
+    def _add(self, slug, fields):
+        # a word scores the weights of the fields it appears in
+        weights = defaultdict(float)
+        for field, weight in WEIGHTS:
+            for word in set(tokenize(fields[field] or '')):
+                weights[word] += weight
+        for word, weight in weights.items():
+            self.postings[word][slug] = weight
+        self.documents[slug] = set(weights)
+
+    def _remove(self, slug):
+        for word in self.documents.pop(slug, ()):
+            self.postings[word].pop(slug, None)
+            if not self.postings[word]:
+                del self.postings[word]
+
+
+def tokenize(text):
+    return re.findall(r'\w+', text.lower())
+
+
+def snippet(body, words):
+    """
+    A window of the body around the first query word, HTML-escaped with
+    the matches highlighted
+    """
+    tokens = (body or '').split()
+    normalized = [''.join(tokenize(token)) for token in tokens]
+    start = next((i for i, token in enumerate(normalized) if token in words),
+                 0)
+    start = max(start - SNIPPET_WORDS // 3, 0)
+    window = range(start, min(start + SNIPPET_WORDS, len(tokens)))
+    return ' '.join(
+        f'{HIGHLIGHT[0]}{escape(tokens[i])}{HIGHLIGHT[1]}'
+        if normalized[i] in words else escape(tokens[i])
+        for i in window)
+
+
+memory_search = MemorySearch()
+
+
+def get_search_backend():
+    if connection.vendor == 'postgresql':
+        return PostgresSearch()
+    return memory_search
@@ -1,12 +1,20 @@
 from rest_framework import serializers
 from django.core.validators import MinValueValidator, MaxValueValidator
-from django.db.models import Avg
-from .models import Article, Rating, Comment, Favorite
-from authors.apps.authentication.serializers import UserSerializer
-from authors.apps.authentication.models import User
+from .models import Article, Rating, RatingSummary, Comment, Favorite
+from authors.apps.authentication.cache import author_summaries
+from authors.apps.core.serializers import FieldSelectionMixin
 
+from .pagination import ArticleCursorPagination
 
-class ArticleSerializer(serializers.ModelSerializer):
+
+def page_of(serializer):
+    """The instances serialized alongside `serializer`'s, if many"""
+    if isinstance(serializer.parent, serializers.ListSerializer):
+        return serializer.parent.instance or ()
+    return ()
+
+
+class ArticleSerializer(FieldSelectionMixin, serializers.ModelSerializer):
     slug = serializers.CharField(read_only=True)
     title = serializers.CharField(
         required=True,
@@ -31,45 +39,56 @@ class ArticleSerializer(serializers.ModelSerializer):
     )
     liked_by = serializers.PrimaryKeyRelatedField(many=True, read_only=True)
     disliked_by = serializers.PrimaryKeyRelatedField(many=True, read_only=True)
-    likes_count = serializers.SerializerMethodField()
-    dislikes_count = serializers.SerializerMethodField()
+    likes_count = serializers.IntegerField(read_only=True)
+    dislikes_count = serializers.IntegerField(read_only=True)
+    favorites_count = serializers.IntegerField(read_only=True)
+    comments_count = serializers.IntegerField(read_only=True)
+    average_rating = serializers.FloatField(read_only=True)
     like_status = serializers.SerializerMethodField(read_only=True)
     dislike_status = serializers.SerializerMethodField(read_only=True)
     author = serializers.SerializerMethodField(read_only=True)
 
     def get_author(self, obj):
         """This method gets the profile object for the article"""
-        serializer = UserSerializer(
-            instance=User.objects.get(username=obj.author))
-        return serializer.data
+        return author_summaries.get(
+            obj.author_id, self.context,
+            batch=[article.author_id for article in page_of(self)])
 
     class Meta:
         model = Article
         fields = ('slug', 'title', 'description',
                   'body', 'image',
                   'liked_by', 'disliked_by', 'likes_count', 'dislikes_count',
+                  'favorites_count', 'comments_count', 'average_rating',
                   'like_status', 'dislike_status',
                   'created_at', 'updated_at', 'author')
 
-    def get_likes_count(self, obj):
-        return obj.liked_by.count()
-
-    def get_dislikes_count(self, obj):
-        return obj.disliked_by.count()
-
     def get_like_status(self, obj):
+        if hasattr(obj, 'viewer_liked'):
+            return obj.viewer_liked
         user = self.context['request'].user
-        likes = obj.liked_by.filter(pk=user.id)
-        if len(likes) > 0:
-            return True
-        return False
+        return obj.liked_by.filter(pk=user.id).exists()
 
     def get_dislike_status(self, obj):
+        if hasattr(obj, 'viewer_disliked'):
+            return obj.viewer_disliked
         user = self.context['request'].user
-        dislikes = obj.disliked_by.filter(pk=user.id)
-        if len(dislikes) > 0:
-            return True
-        return False
+        return obj.disliked_by.filter(pk=user.id).exists()
+
+
+class ArticleFilterSerializer(serializers.Serializer):
+    """Validates the filters and sort order of the article list"""
+    author = serializers.CharField(required=False)
+    created_after = serializers.DateTimeField(required=False)
+    created_before = serializers.DateTimeField(required=False)
+    updated_after = serializers.DateTimeField(required=False)
+    updated_before = serializers.DateTimeField(required=False)
+    min_rating = serializers.DecimalField(
+        max_digits=3, decimal_places=2, min_value=0, max_value=5,
+        required=False)
+    sort = serializers.ChoiceField(
+        choices=sorted(ArticleCursorPagination.sort_orderings),
+        required=False)
 
 
 class RatingSerializer(serializers.ModelSerializer):
@@ -97,15 +116,26 @@ class RatingSerializer(serializers.ModelSerializer):
 
     def get_average_rating(self, obj):
         """Returns the average rating for an article"""
-        average_rating = Rating.objects.filter(
-            article=obj.article).aggregate(Avg('user_rating'))
-        return average_rating["user_rating__avg"]
+        return RatingSummary.of(obj.article).average
 
     class Meta:
         model = Rating
         fields = ("article_slug", "user_rating", "average_rating")
 
 
+class RatingSummarySerializer(serializers.ModelSerializer):
+    """Serializes an article's rating aggregate"""
+    article_slug = serializers.CharField(source='article_id')
+    average_rating = serializers.FloatField(source='average')
+    ratings_count = serializers.IntegerField(source='count')
+    histogram = serializers.DictField(child=serializers.IntegerField())
+
+    class Meta:
+        model = RatingSummary
+        fields = ("article_slug", "average_rating", "ratings_count",
+                  "histogram")
+
+
 class CommentSerializer(serializers.ModelSerializer):
     """This is the serializer class for comments
 
@@ -113,6 +143,7 @@ class CommentSerializer(serializers.ModelSerializer):
     """
     author_id = serializers.SerializerMethodField()
     article_id = serializers.SerializerMethodField()
+    children = serializers.SerializerMethodField()
     body = serializers.CharField(
         required=True,
         max_length=250,
@@ -132,23 +163,33 @@ class CommentSerializer(serializers.ModelSerializer):
                 'author': thread.author.username,
                 'created_at': self.format_date(thread.created_at),
                 'updated_at': self.format_date(thread.updated_at)
-            } for thread in instance.children.all()
+            } for thread in self.get_replies(instance)
         ]
         return children
 
+    def get_children(self, instance):
+        """Return the replies to this comment"""
+        return self.create_children(instance)
+
+    def get_replies(self, instance):
+        """The replies loaded for this comment, or else all of them"""
+        replies = getattr(instance, 'replies', None)
+        if replies is None:
+            replies = instance.children.all()
+        return replies
+
     def to_representation(self, instance):
         """For custom output"""
 
-        children = self.create_children(instance)
-
         representation = super(CommentSerializer,
                                self).to_representation(instance)
         representation['created_at'] = self.format_date(instance.created_at)
         representation['updated_at'] = self.format_date(instance.updated_at)
         representation['author'] = instance.author.username
         representation['article'] = instance.article.title
-        representation['reply_count'] = instance.children.count()
-        representation['children'] = children
+        representation['reply_count'] = instance.reply_count
+        if hasattr(instance, 'replies_cursor'):
+            representation['replies_cursor'] = instance.replies_cursor
 
         return representation
 
@@ -165,11 +206,11 @@ class CommentSerializer(serializers.ModelSerializer):
 
     def get_author_id(self, obj):
         """Return author username"""
-        return obj.author.id
+        return obj.author_id
 
     def get_article_id(self, obj):
         """Return article """
-        return obj.article.slug
+        return obj.article_id
 
     def create(self, validated_data):
         return Comment.objects.create(**validated_data)
@@ -187,10 +228,10 @@ class FavoriteInfoSerializer(serializers.BaseSerializer):
     """Serializer for the data to be rendered."""
 
     def get_author(self, obj):
-        """This method gets the profile object for the article"""
-        serializer = UserSerializer(
-            instance=User.objects.get(username=obj.user))
-        return serializer.data
+        """This method gets the profile of the favoriting user"""
+        return author_summaries.get(
+            obj.user_id, self.context,
+            batch=[favorite.user_id for favorite in page_of(self)])
 
     def format_date(self, date):
         return date.strftime('%d %b %Y %H:%M:%S')
@@ -1,3 +1,10 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
 from authors.apps.authentication.tests.base_test import BaseTest
 from authors.apps.authentication.models import User
 
@@ -192,7 +199,7 @@ class TestArticles(BaseTest):
         response = self.client.get(self.notification_url,
                                    format='json',
                                    HTTP_AUTHORIZATION=f'token {token}')
-        self.assertIsInstance(response.data, list)
+        self.assertIsInstance(response.data['notifications'], list)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
     def test_get_single_notification(self):
@@ -206,11 +213,126 @@ class TestArticles(BaseTest):
                          self.article,
                          format='json',
                          HTTP_AUTHORIZATION=f'token {token1}')
+        call_command('notification_worker', once=True, stdout=StringIO())
         response = self.client.get(self.notification_url,
                                    format='json',
                                    HTTP_AUTHORIZATION=f'token {token2}')
-        not_id = response.data[0]['id']
+        not_id = response.data['notifications'][0]['id']
         response2 = self.client.get(self.notification_url + f'{not_id}' + '/',
                                     format='json',
                                     HTTP_AUTHORIZATION=f'token {token2}')
         self.assertEqual(response2.status_code, status.HTTP_200_OK)
+
+    def test_articles_are_paginated_with_cursors(self):
+        """Article listing is split into pages linked by cursors"""
+        token = self.authenticate_user(self.auth_user_data).data["token"]
+        for _ in range(3):
+            self.client.post(self.articles_url, self.article, format='json',
+                             HTTP_AUTHORIZATION=f'token {token}')
+        response = self.client.get(self.articles_url, {'limit': 2})
+        first_page = [a['slug'] for a in response.data['Articles']]
+        self.assertEqual(first_page, ['the-andela-way', 'the-andela-way-1'])
+        self.assertIsNone(response.data['previous'])
+
+        response = self.client.get(response.data['next'])
+        self.assertEqual([a['slug'] for a in response.data['Articles']],
+                         ['the-andela-way-2'])
+        self.assertIsNone(response.data['next'])
+
+        response = self.client.get(response.data['previous'])
+        self.assertEqual([a['slug'] for a in response.data['Articles']],
+                         first_page)
+
+    def test_articles_invalid_cursor(self):
+        """A tampered cursor is rejected"""
+        response = self.client.get(self.articles_url, {'cursor': 'bogus'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_list_articles_query_count_is_constant(self):
+        """Listing articles costs the same queries for any page length"""
+        token = self.authenticate_user(self.auth_user_data).data["token"]
+
+        def create_articles(count):
+            for _ in range(count):
+                slug = self.client.post(
+                    self.articles_url, self.article, format='json',
+                    HTTP_AUTHORIZATION=f'token {token}').data['slug']
+                self.client.patch(self.likes_article_url(slug),
+                                  HTTP_AUTHORIZATION=f'token {token}')
+
+        def count_list_queries():
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(
+                    self.articles_url, HTTP_AUTHORIZATION=f'token {token}')
+            self.assertTrue(response.data['Articles'][0]['like_status'])
+            return len(queries)
+
+        create_articles(2)
+        few = count_list_queries()
+        create_articles(4)
+        many = count_list_queries()
+        self.assertEqual(few, many)
+        self.assertLessEqual(many, 6)
+
+    def test_select_article_fields(self):
+        """Only the requested fields are rendered"""
+        slug = self.create_article()
+        response = self.client.get(
+            self.articles_url + f'{slug}/',
+            {'fields': 'slug,likes_count,like_status,unknown'})
+        self.assertEqual(set(response.data),
+                         {'slug', 'likes_count', 'like_status'})
+
+    def test_exclude_skips_relation_queries(self):
+        """Excluded like lists are neither rendered nor loaded"""
+        token = self.authenticate_user(self.auth_user_data).data["token"]
+        self.create_article()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                self.articles_url, {'exclude': 'liked_by,disliked_by'},
+                HTTP_AUTHORIZATION=f'token {token}')
+        article = response.data['Articles'][0]
+        self.assertNotIn('liked_by', article)
+        self.assertIn('likes_count', article)
+        self.assertNotIn('INNER JOIN "articles_article_liked_by"',
+                         ' '.join(query['sql'] for query in queries))
+
+    def test_batch_fetch_keeps_requested_order(self):
+        """Batched articles come back in order with not-found markers"""
+        first = self.create_article()
+        second = self.create_article()
+        response = self.client.get(reverse('articles:articles-batch'),
+                                   {'slugs': f'{second},missing,{first}'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item['slug'] for item in response.data],
+                         [second, 'missing', first])
+        self.assertEqual(response.data[1]['error'], 'Article not found')
+        self.assertIn('likes_count', response.data[0])
+
+    def test_batch_fetch_by_post(self):
+        """Slug lists can be sent in the request body"""
+        slug = self.create_article()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('articles:articles-batch'),
+                                        {'slugs': [slug, slug]},
+                                        format='json')
+        self.assertEqual([item['slug'] for item in response.data],
+                         [slug, slug])
+        self.assertLessEqual(len(queries), 5)
+
+    def test_batch_fetch_body_shapes(self):
+        """A bare list is accepted, other non-object bodies rejected"""
+        slug = self.create_article()
+        url = reverse('articles:articles-batch')
+        response = self.client.post(url, [slug], format='json')
+        self.assertEqual([item['slug'] for item in response.data], [slug])
+        for body in ('"slug"', '7', 'null'):
+            response = self.client.post(url, body,
+                                        content_type='application/json')
+            self.assertEqual(response.status_code,
+                             status.HTTP_400_BAD_REQUEST)
+
+    def test_batch_fetch_requires_slugs(self):
+        """An empty slug list is rejected"""
+        response = self.client.get(reverse('articles:articles-batch'))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,114 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from authors.apps.articles.cache import ArticleFragmentCache, article_cache
+from authors.apps.articles.models import Article, Comment, RatingSummary
+from authors.apps.authentication.models import User
+
+
+class ArticleFragmentCacheTestCase(TestCase):
+    """Tests for the versioned cache of serialized articles"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.writer = User.objects.create_user(
+            'writer', 'writer@example.com', 'password')
+        self.reader = User.objects.create_user(
+            'reader', 'reader@example.com', 'password')
+        self.article = Article.objects.create(
+            title='news', description='d', body='b', author=self.writer)
+        self.url = reverse('articles:single-article', args=[self.article.slug])
+
+    def get(self, **params):
+        return self.client.get(self.url, params).data
+
+    def test_second_read_is_a_hit(self):
+        """A cached article costs only the conditional GET's query"""
+        first = self.get()
+        with self.assertNumQueries(1):
+            second = self.get()
+        self.assertEqual(first, second)
+        self.assertEqual(article_cache.stats(), {'hits': 1, 'misses': 1})
+
+    def test_viewer_fields_are_merged_per_request(self):
+        """The like state is never shared between viewers"""
+        self.client.force_authenticate(self.reader)
+        self.client.patch(reverse('articles:like_article',
+                                  args=[self.article.slug]))
+        liked = self.get()
+        self.assertTrue(liked['like_status'])
+        self.assertEqual(liked['likes_count'], 1)
+        self.assertEqual(liked['liked_by'], [self.reader.pk])
+        self.client.force_authenticate(self.writer)
+        self.assertFalse(self.get()['like_status'])
+        self.client.force_authenticate(None)
+        self.assertFalse(self.get()['like_status'])
+
+    def test_article_changes_expire_the_entry(self):
+        """Saves, ratings and comments each move the article's version"""
+        self.get()
+        self.article.title = 'breaking'
+        self.article.save()
+        self.assertEqual(self.get()['title'], 'breaking')
+        RatingSummary.record(self.article, 4)
+        self.assertEqual(self.get()['average_rating'], 4.0)
+        self.client.force_authenticate(self.reader)
+        self.client.post(reverse('articles:comments-all',
+                                 args=[self.article.slug]),
+                         {'body': 'nice'}, format='json')
+        self.assertEqual(Comment.objects.count(), 1)
+        self.assertEqual(self.get()['comments_count'], 1)
+
+    def test_author_changes_expire_the_entry(self):
+        """Profile edits and follows show in the author block"""
+        self.get()
+        self.writer.bio = 'writes news'
+        self.writer.save()
+        self.assertEqual(self.get()['author']['bio'], 'writes news')
+        self.reader.following.add(self.writer)
+        self.assertEqual(self.get()['author']['followers'], [self.reader.pk])
+
+    def test_field_selection(self):
+        """Requested fields are picked from the cached representation"""
+        self.get()
+        data = self.get(fields='slug,like_status')
+        self.assertEqual(list(data), ['slug', 'like_status'])
+
+    def test_clear_retires_every_entry(self):
+        self.get()
+        Article.objects.filter(pk=self.article.pk).update(title='quiet')
+        self.assertEqual(self.get()['title'], 'news')
+        article_cache.clear()
+        self.assertEqual(self.get()['title'], 'quiet')
+
+    def test_missing_article(self):
+        response = self.client.get(
+            reverse('articles:single-article', args=['missing']))
+        self.assertEqual(response.status_code, 404)
+        self.assertIsNone(cache.get(article_cache.key('article', 'missing')))
+        self.assertIsNone(cache.get(article_cache.key('author', None)))
+
+    def test_versions_expire(self):
+        """Version keys outlive the entries but are not kept forever"""
+        with mock.patch.object(cache, 'add', wraps=cache.add) as add:
+            self.get()
+        timeouts = {call[0][0]: call[0][2] for call in add.call_args_list}
+        self.assertEqual(timeouts[article_cache.key(
+            'article', self.article.slug)], 2 * article_cache.timeout)
+        self.assertEqual(timeouts[article_cache.key(
+            'author', self.writer.pk)], 2 * article_cache.timeout)
+
+    @override_settings(ARTICLE_CACHE={
+        'ENABLED': False, 'TIMEOUT': 60, 'BACKEND': 'default'})
+    def test_disabled(self):
+        disabled = ArticleFragmentCache()
+        calls = []
+        for _ in range(2):
+            disabled.fetch(self.article.slug, calls.append,
+                           lambda: calls.append('load'))
+        self.assertEqual(calls, ['load', 'load'])
@@ -1,6 +1,13 @@
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from rest_framework import status
+from rest_framework.utils.urls import replace_query_param
 from django.urls import reverse
 
+from authors.apps.articles.models import Comment
 from authors.apps.authentication.tests.base_test import BaseTest
 
 
@@ -261,3 +268,88 @@ class CommentsTestCase(BaseTest):
         token = self.authenticate_user(self.auth_user_data).data['token']
         response = self.single_comment_crud("POST_400", token)
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class CommentThreadsTestCase(BaseTest):
+    """Tests for listing an article's comment threads"""
+
+    def setUp(self):
+        super().setUp()
+        self.token = self.authenticate_user(
+            self.auth_user_data).data['token']
+        self.slug = self.client.post(
+            self.articles_url, self.article, format='json',
+            HTTP_AUTHORIZATION=f'token {self.token}').data['slug']
+        self.comments_url = reverse('articles:comments-all',
+                                    kwargs={'pk': self.slug})
+
+    def add_threads(self, count, replies):
+        for _ in range(count):
+            parent_id = self.client.post(
+                self.comments_url, self.comment, format='json',
+                HTTP_AUTHORIZATION=f'token {self.token}').data['id']
+            reply_url = reverse('articles:single-comment',
+                                kwargs={'pk': self.slug, 'id': parent_id})
+            for _ in range(replies):
+                self.client.post(reply_url, self.comment, format='json',
+                                 HTTP_AUTHORIZATION=f'token {self.token}')
+
+    def count_list_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.comments_url)
+        return len(queries), response
+
+    def test_query_count_is_constant(self):
+        """Threads load in the same queries whatever their size"""
+        self.add_threads(1, replies=1)
+        few, _ = self.count_list_queries()
+        self.add_threads(4, replies=3)
+        many, response = self.count_list_queries()
+        self.assertEqual(few, many)
+        self.assertLessEqual(many, 3)
+        self.assertEqual(len(response.data['Comments']), 5)
+        self.assertEqual(len(response.data['Comments'][0]['children']), 3)
+
+    def test_threads_are_paginated(self):
+        """Top-level comments come newest first in cursor linked pages"""
+        self.add_threads(3, replies=1)
+        response = self.client.get(self.comments_url, {'limit': 2})
+        self.assertEqual(len(response.data['Comments']), 2)
+        response = self.client.get(response.data['next'])
+        self.assertEqual(len(response.data['Comments']), 1)
+        self.assertEqual(len(response.data['Comments'][0]['children']), 1)
+        self.assertIsNone(response.data['next'])
+
+    @override_settings(COMMENT_INLINE_REPLIES=2)
+    def test_inline_replies_are_capped(self):
+        """Long threads inline a few replies and link to the rest"""
+        self.add_threads(2, replies=5)
+        self.add_threads(1, replies=1)
+        count, response = self.count_list_queries()
+        self.assertLessEqual(count, 3)
+        short, *long = response.data['Comments']
+        self.assertEqual(len(short['children']), 1)
+        self.assertIsNone(short['replies_cursor'])
+
+        thread = long[0]
+        self.assertEqual([len(t['children']) for t in long], [2, 2])
+        response = self.client.get(
+            replace_query_param(thread['replies_cursor'], 'limit', 2))
+        page = response.data
+        self.assertEqual(len(page['children']), 2)
+        self.assertGreater(page['children'][0]['id'],
+                           thread['children'][-1]['id'])
+        response = self.client.get(page['replies_cursor'])
+        self.assertEqual(len(response.data['children']), 1)
+        self.assertIsNone(response.data['replies_cursor'])
+
+    @skipUnless(connection.vendor == 'sqlite', 'reads an SQLite query plan')
+    def test_reply_cap_seeks_the_thread_index(self):
+        """Each capped reply list is read from the comment index"""
+        inline = Comment.objects.threads(2) \
+            ._prefetch_related_lookups[0].queryset.filter(parent__in=[1])
+        sql, params = inline.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+            plan = ' '.join(str(row[-1]) for row in cursor.fetchall())
+        self.assertIn('article_id=? AND parent_id=?', plan)
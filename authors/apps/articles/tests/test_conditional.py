@@ -0,0 +1,102 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from authors.apps.articles.models import Article, RatingSummary
+from authors.apps.authentication.models import User
+
+
+class ConditionalGetTestCase(TestCase):
+    """Tests for ETag and Last-Modified revalidation of articles"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.writer = User.objects.create_user(
+            'writer', 'writer@example.com', 'password')
+        self.reader = User.objects.create_user(
+            'reader', 'reader@example.com', 'password')
+        self.article = Article.objects.create(
+            title='news', description='d', body='b', author=self.writer)
+        self.detail_url = reverse(
+            'articles:single-article', args=[self.article.slug])
+        self.list_url = reverse('articles:articles-all')
+
+    def revalidate(self, url, response):
+        return self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+
+    def test_unchanged_article_is_not_modified(self):
+        """A matching ETag gets a 304 without running the serializer"""
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('Last-Modified', response)
+        with self.assertNumQueries(1):
+            again = self.revalidate(self.detail_url, response)
+        self.assertEqual(again.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(again.content, b'')
+
+    def test_if_modified_since(self):
+        """An unchanged article is not modified since its Last-Modified"""
+        response = self.client.get(self.detail_url)
+        again = self.client.get(
+            self.detail_url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(again.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_counter_changes_are_seen(self):
+        """Counters moving change both validators"""
+        response = self.client.get(self.detail_url)
+        stamp = http_date((timezone.now() - timedelta(minutes=1)).timestamp())
+        Article.objects.filter(pk=self.article.pk).update(
+            updated_at=timezone.now() - timedelta(minutes=2),
+            counted_at=timezone.now() - timedelta(minutes=2))
+        RatingSummary.record(self.article, 4)
+        self.assertEqual(self.revalidate(self.detail_url, response)
+                         .status_code, status.HTTP_200_OK)
+        since = self.client.get(self.detail_url, HTTP_IF_MODIFIED_SINCE=stamp)
+        self.assertEqual(since.status_code, status.HTTP_200_OK)
+
+    def test_author_follow_changes_are_seen(self):
+        """The embedded author's follow lists are part of the article"""
+        response = self.client.get(self.detail_url)
+        self.reader.following.add(self.writer)
+        self.assertEqual(self.revalidate(self.detail_url, response)
+                         .status_code, status.HTTP_200_OK)
+
+    def test_validators_vary_by_viewer(self):
+        """Another viewer's like state is never served from an ETag"""
+        response = self.client.get(self.detail_url)
+        self.assertIn('Authorization', response['Vary'])
+        self.client.force_authenticate(self.reader)
+        self.assertEqual(self.revalidate(self.detail_url, response)
+                         .status_code, status.HTTP_200_OK)
+
+    def test_unchanged_list_page_is_not_modified(self):
+        """A page of the list revalidates until an article on it changes"""
+        response = self.client.get(self.list_url)
+        self.assertNotIn('Last-Modified', response)
+        self.assertEqual(self.revalidate(self.list_url, response)
+                         .status_code, status.HTTP_304_NOT_MODIFIED)
+        self.article.adjust_counters(favorites_count=1)
+        self.assertEqual(self.revalidate(self.list_url, response)
+                         .status_code, status.HTTP_200_OK)
+
+    def test_list_validators_follow_the_page(self):
+        """Deleted articles and other query strings change the ETag"""
+        response = self.client.get(self.list_url)
+        self.assertEqual(self.client.get(
+            self.list_url + '?sort=likes', HTTP_IF_NONE_MATCH=response['ETag']
+        ).status_code, status.HTTP_200_OK)
+        self.article.delete()
+        self.assertEqual(self.revalidate(self.list_url, response)
+                         .status_code, status.HTTP_200_OK)
+
+    def test_missing_article_has_no_validators(self):
+        response = self.client.get(
+            reverse('articles:single-article', args=['missing']),
+            HTTP_IF_NONE_MATCH='*')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertNotIn('ETag', response)
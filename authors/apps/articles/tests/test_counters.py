@@ -0,0 +1,73 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+
+from authors.apps.articles.models import Article, Comment
+from authors.apps.authentication.tests.base_test import BaseTest
+
+
+class TestArticleCounters(BaseTest):
+    """Tests for the denormalized article and comment counters"""
+
+    def setUp(self):
+        super().setUp()
+        self.token = self.authenticate_user(
+            self.auth_user_data).data['token']
+        self.slug = self.client.post(
+            self.articles_url, self.article, format='json',
+            HTTP_AUTHORIZATION=f'token {self.token}').data['slug']
+        self.comments_url = reverse('articles:comments-all',
+                                    kwargs={'pk': self.slug})
+
+    def post_comment(self, url):
+        return self.client.post(url, self.comment, format='json',
+                                HTTP_AUTHORIZATION=f'token {self.token}')
+
+    def test_comment_and_reply_counters(self):
+        """Comments and replies update the stored counters"""
+        parent_id = self.post_comment(self.comments_url).data['id']
+        reply_url = reverse('articles:single-comment',
+                            kwargs={'pk': self.slug, 'id': parent_id})
+        self.post_comment(reply_url)
+        self.assertEqual(Article.objects.get(pk=self.slug).comments_count, 2)
+        self.assertEqual(Comment.objects.get(pk=parent_id).reply_count, 1)
+
+        response = self.client.delete(
+            reply_url, HTTP_AUTHORIZATION=f'token {self.token}')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(Article.objects.get(pk=self.slug).comments_count, 0)
+
+    def test_favorite_counter(self):
+        """Favoriting and unfavoriting update the stored counter"""
+        url = reverse('articles:favorite_article', args=[self.slug])
+        self.client.put(url, HTTP_AUTHORIZATION=f'token {self.token}')
+        self.assertEqual(
+            Article.objects.get(pk=self.slug).favorites_count, 1)
+        self.client.delete(url, HTTP_AUTHORIZATION=f'token {self.token}')
+        self.assertEqual(
+            Article.objects.get(pk=self.slug).favorites_count, 0)
+
+    def test_edits_keep_the_counters(self):
+        """Saving an article read before a like does not undo the like"""
+        stale = Article.objects.get(pk=self.slug)
+        self.client.patch(self.likes_article_url(self.slug),
+                          HTTP_AUTHORIZATION=f'token {self.token}')
+        stale.body = 'edited'
+        stale.save()
+        article = Article.objects.get(pk=self.slug)
+        self.assertEqual(article.likes_count, 1)
+        self.assertEqual(article.body, 'edited')
+
+    def test_repair_counters_fixes_drift(self):
+        """The repair command recomputes drifted counters"""
+        self.client.patch(self.likes_article_url(self.slug),
+                          HTTP_AUTHORIZATION=f'token {self.token}')
+        self.post_comment(self.comments_url)
+        Article.objects.filter(pk=self.slug).update(
+            likes_count=7, comments_count=0)
+        call_command('repair_counters', stdout=StringIO())
+        article = Article.objects.get(pk=self.slug)
+        self.assertEqual(article.likes_count, 1)
+        self.assertEqual(article.comments_count, 1)
@@ -0,0 +1,73 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from authors.apps.articles.models import Article, TimelineEntry
+from authors.apps.authentication.models import User
+from authors.apps.notify.fanout import run_pending_jobs
+
+
+class FeedTestCase(TestCase):
+    """Tests for the following feed under both strategies"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.reader = User.objects.create_user(
+            'reader', 'reader@example.com', 'password')
+        self.followed = User.objects.create_user(
+            'followed', 'followed@example.com', 'password')
+        self.stranger = User.objects.create_user(
+            'stranger', 'stranger@example.com', 'password')
+        self.client.force_authenticate(self.reader)
+
+    def publish(self, author, title='news'):
+        return Article.objects.create(
+            title=title, description='d', body='b', author=author)
+
+    def feed(self, **params):
+        response = self.client.get(reverse('articles:feed'), params)
+        return response.data
+
+    def slugs(self, page):
+        return [article['slug'] for article in page['Articles']]
+
+    def test_feed_on_read(self):
+        """Only followed authors' articles are listed, newest first"""
+        self.reader.following.add(self.followed)
+        first = self.publish(self.followed)
+        self.publish(self.stranger)
+        second = self.publish(self.followed)
+        self.assertEqual(self.slugs(self.feed()), [second.slug, first.slug])
+
+    @override_settings(ARTICLE_FEED_STRATEGY='write')
+    def test_feed_on_write(self):
+        """The worker writes new articles into followers' timelines"""
+        self.reader.following.add(self.followed)
+        articles = [self.publish(self.followed) for _ in range(3)]
+        self.publish(self.stranger)
+        self.assertEqual(self.feed()['Articles'], [])
+
+        run_pending_jobs()
+        page = self.feed(limit=2)
+        self.assertEqual(self.slugs(page),
+                         [articles[2].slug, articles[1].slug])
+        page = self.client.get(page['next']).data
+        self.assertEqual(self.slugs(page), [articles[0].slug])
+
+    @override_settings(ARTICLE_FEED_STRATEGY='write')
+    def test_timeline_follows_subscriptions(self):
+        """Following backfills a timeline and unfollowing empties it"""
+        article = self.publish(self.followed)
+        self.reader.following.add(self.followed)
+        self.assertEqual(self.slugs(self.feed()), [article.slug])
+
+        run_pending_jobs()
+        self.assertEqual(TimelineEntry.objects.count(), 1)
+        self.reader.following.remove(self.followed)
+        self.assertEqual(self.feed()['Articles'], [])
+
+    def test_feed_requires_authentication(self):
+        """Anonymous users have no feed"""
+        self.client.force_authenticate(None)
+        response = self.client.get(reverse('articles:feed'))
+        self.assertEqual(response.status_code, 403)
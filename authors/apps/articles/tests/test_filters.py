@@ -0,0 +1,150 @@
+from datetime import timedelta
+from decimal import Decimal
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from authors.apps.articles.models import Article, RatingSummary
+from authors.apps.articles.pagination import ArticleCursorPagination
+from authors.apps.authentication.models import User
+
+
+class ArticleFilterTestCase(TestCase):
+    """Tests for filtering and sorting the article list"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.writer = User.objects.create_user(
+            'writer', 'writer@example.com', 'password')
+        self.other = User.objects.create_user(
+            'other', 'other@example.com', 'password')
+
+    def publish(self, author, **counters):
+        article = Article.objects.create(
+            title='news', description='d', body='b', author=author)
+        if counters:
+            Article.objects.filter(pk=article.pk).update(**counters)
+        return article
+
+    def list_slugs(self, **params):
+        response = self.client.get(reverse('articles:articles-all'), params)
+        return [article['slug'] for article in response.data['Articles']]
+
+    def test_filter_by_author(self):
+        """Only the named author's articles are listed"""
+        mine = self.publish(self.writer)
+        self.publish(self.other)
+        self.assertEqual(self.list_slugs(author='writer'), [mine.slug])
+        self.assertEqual(self.list_slugs(author='nobody'), [])
+
+    def test_filter_by_date_range(self):
+        """Articles can be bounded by creation and update dates"""
+        old = self.publish(self.writer)
+        new = self.publish(self.writer)
+        week_ago = timezone.now() - timedelta(days=7)
+        Article.objects.filter(pk=old.pk).update(
+            created_at=week_ago, updated_at=week_ago)
+        cutoff = (timezone.now() - timedelta(days=1)).isoformat()
+        self.assertEqual(self.list_slugs(created_after=cutoff), [new.slug])
+        self.assertEqual(self.list_slugs(updated_before=cutoff), [old.slug])
+
+    def test_filter_by_minimum_rating(self):
+        """Ratings are folded into a filterable average"""
+        rated = self.publish(self.writer)
+        unrated = self.publish(self.writer)
+        RatingSummary.record(rated, 5)
+        RatingSummary.record(rated, 4)
+        self.assertEqual(Article.objects.get(pk=rated.pk).average_rating,
+                         Decimal('4.50'))
+        self.assertEqual(self.list_slugs(min_rating='4.5'), [rated.slug])
+        self.assertEqual(self.list_slugs(min_rating='0'),
+                         [rated.slug, unrated.slug])
+
+    def test_sort_orders(self):
+        """Each sort lists the highest first and pages with cursors"""
+        low = self.publish(self.writer, likes_count=1, favorites_count=3)
+        high = self.publish(self.writer, likes_count=5, favorites_count=0)
+        RatingSummary.record(low, 4.25)
+        self.assertEqual(self.list_slugs(sort='likes'), [high.slug, low.slug])
+        self.assertEqual(self.list_slugs(sort='favorites'),
+                         [low.slug, high.slug])
+        self.assertEqual(self.list_slugs(sort='recent'),
+                         [high.slug, low.slug])
+
+        response = self.client.get(reverse('articles:articles-all'),
+                                   {'sort': 'rating', 'limit': 1})
+        self.assertEqual(response.data['Articles'][0]['slug'], low.slug)
+        response = self.client.get(response.data['next'])
+        self.assertEqual(response.data['Articles'][0]['slug'], high.slug)
+
+    def test_invalid_filters_are_rejected(self):
+        """Unknown sorts and malformed values are a bad request"""
+        url = reverse('articles:articles-all')
+        self.assertEqual(
+            self.client.get(url, {'sort': 'random'}).status_code, 400)
+        self.assertEqual(
+            self.client.get(url, {'min_rating': '9'}).status_code, 400)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'needs PostgreSQL')
+class ArticleFilterPlanTestCase(TestCase):
+    """Every filter and sort of the article list reads through an index"""
+    rows = 1000000
+
+    @classmethod
+    def setUpTestData(cls):
+        User.objects.bulk_create(
+            User(username=f'planner{i}', email=f'planner{i}@example.com')
+            for i in range(100))
+        authors = list(User.objects.filter(
+            username__startswith='planner').values_list('id', flat=True))
+        with connection.cursor() as cursor:
+            # the search vector is not under test; skip the trigger
+            cursor.execute('ALTER TABLE articles_article DISABLE TRIGGER '
+                           'articles_article_search_vector_trigger')
+            cursor.execute('''
+                INSERT INTO articles_article (
+                    slug, title, description, body, author_id,
+                    created_at, updated_at, likes_count, dislikes_count,
+                    favorites_count, comments_count, average_rating,
+                    counted_at)
+                SELECT 'plan-' || i, 'title', 'description', 'body',
+                    (%s::integer[])[1 + i %% 100],
+                    now() - i * interval '1 minute',
+                    now() - (i %% 5000) * interval '1 minute',
+                    i %% 997, 0, i %% 499, 0, (i %% 500) / 100.0, now()
+                FROM generate_series(1, %s) AS i
+            ''', [authors, cls.rows])
+            cursor.execute('ALTER TABLE articles_article ENABLE TRIGGER '
+                           'articles_article_search_vector_trigger')
+            cursor.execute('ANALYZE articles_article')
+        cls.author = User.objects.get(username='planner7')
+
+    def assertIndexScan(self, sort=None, **criteria):
+        ordering = ArticleCursorPagination(sort).ordering
+        queryset = Article.objects.filter_by(**criteria) \
+            .order_by(*ordering)[:21]
+        plan = queryset.explain()
+        self.assertNotIn('Seq Scan on articles_article', plan,
+                         f'{sort} {criteria}:\n{plan}')
+
+    def test_sorts_use_indexes(self):
+        for sort in [None, *ArticleCursorPagination.sort_orderings]:
+            self.assertIndexScan(sort)
+
+    def test_filters_use_indexes(self):
+        day_ago = timezone.now() - timedelta(days=1)
+        filters = [
+            {'author': self.author.username},
+            {'created_after': day_ago},
+            {'created_before': day_ago},
+            {'updated_after': day_ago},
+            {'min_rating': Decimal('4.5')},
+        ]
+        for criteria in filters:
+            for sort in [None, *ArticleCursorPagination.sort_orderings]:
+                self.assertIndexScan(sort, **criteria)
@@ -1,4 +1,9 @@
+from unittest import mock
+
+from django.db import IntegrityError, connection
+from django.test.utils import CaptureQueriesContext
 from rest_framework.views import status
+from authors.apps.articles.models import Article
 from authors.apps.authentication.tests.base_test import BaseTest
 
 
@@ -84,3 +89,62 @@ class TestLikeDislikeCase(BaseTest):
                                      )
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(0, response.data['dislikes_count'])
+
+    def test_response_is_compact(self):
+        """Only the counters and the viewer's status are returned"""
+        response = self.create_and_like_article()
+        self.assertEqual(
+            set(response.data), {'slug', 'likes_count', 'dislikes_count',
+                                 'like_status', 'dislike_status'})
+        self.assertTrue(response.data['like_status'])
+        self.assertFalse(response.data['dislike_status'])
+
+    def test_toggle_does_not_load_likers(self):
+        """The toggle never selects the users who liked the article"""
+        token = self.authenticate_user(self.auth_user_data).data['token']
+        slug = self.create_article()
+        with CaptureQueriesContext(connection) as queries:
+            self.client.patch(BaseTest.likes_article_url(slug),
+                              format='json',
+                              HTTP_AUTHORIZATION=f'Token {token}')
+        for query in queries:
+            self.assertNotIn('INNER JOIN "articles_article_liked_by"',
+                             query['sql'])
+
+    def test_anonymous_reactions_are_refused(self):
+        """Reacting needs a user; nothing is stored for anonymous requests"""
+        slug = self.create_article()
+        for url in (BaseTest.likes_article_url(slug),
+                    BaseTest.dislikes_article_url(slug)):
+            response = self.client.patch(url, format='json')
+            self.assertEqual(response.status_code,
+                             status.HTTP_403_FORBIDDEN)
+        article = Article.objects.get(slug=slug)
+        self.assertEqual(article.likes_count, 0)
+        self.assertEqual(article.liked_by.count(), 0)
+
+    def test_unexpected_integrity_errors_propagate(self):
+        """Only a concurrent duplicate like is treated as success"""
+        token = self.authenticate_user(self.auth_user_data).data['token']
+        slug = self.create_article()
+        with mock.patch.object(Article.liked_by.through.objects, 'create',
+                               side_effect=IntegrityError('not null')):
+            with self.assertRaises(IntegrityError):
+                self.client.patch(BaseTest.likes_article_url(slug),
+                                  format='json',
+                                  HTTP_AUTHORIZATION=f'Token {token}')
+        self.assertEqual(Article.objects.get(slug=slug).likes_count, 0)
+
+    def test_counts_are_read_back_after_the_update(self):
+        """The response carries the stored counters, not a stale copy"""
+        token = self.authenticate_user(self.auth_user_data).data['token']
+        slug = self.create_article()
+        Article.objects.filter(slug=slug).update(likes_count=5,
+                                                 dislikes_count=2)
+        response = self.client.patch(BaseTest.likes_article_url(slug),
+                                     format='json',
+                                     HTTP_AUTHORIZATION=f'Token {token}')
+        self.assertEqual(response.data['likes_count'], 6)
+        self.assertEqual(response.data['dislikes_count'], 2)
+        stored = Article.objects.get(slug=slug)
+        self.assertEqual(stored.likes_count, 6)
@@ -1,3 +1,5 @@
+from django.urls import reverse
+
 from authors.apps.authentication.tests.base_test import BaseTest
 
 from rest_framework import status
@@ -98,3 +100,25 @@ class TestArticleRatings(BaseTest):
             "user_rating": 3.0,
             "average_rating": 2.5
         })
+
+    def test_rating_summary_tracks_changes(self):
+        """Re-rating moves the rating between histogram buckets"""
+        self.rate_an_article(self.auth_user_data, 2)
+        self.rate_an_article(self.auth_user3_data, 5)
+        response = self.rate_an_article(self.auth_user_data, 4)
+        self.assertEqual(response.data["data"]["average_rating"], 4.5)
+
+        response = self.client.get(reverse("articles:ratings-summary"),
+                                   {"slugs": "rate-this,not-an-article"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["ratings"], [{
+            "article_slug": "rate-this",
+            "average_rating": 4.5,
+            "ratings_count": 2,
+            "histogram": {"1": 0, "2": 0, "3": 0, "4": 1, "5": 1}
+        }])
+
+    def test_rating_summary_requires_slugs(self):
+        """The bulk summary endpoint needs a list of slugs"""
+        response = self.client.get(reverse("articles:ratings-summary"))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,98 @@
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from authors.apps.articles.models import Article
+from authors.apps.articles.search import memory_search
+from authors.apps.authentication.models import User
+
+
+class SearchTestCase(TestCase):
+    """Tests for full-text article search"""
+
+    def setUp(self):
+        memory_search.clear()
+        self.client = APIClient()
+        self.author = User.objects.create_user(
+            'writer', 'writer@example.com', 'password')
+
+    def publish(self, title, body='nothing to see', description='d'):
+        return Article.objects.create(
+            title=title, description=description, body=body,
+            author=self.author)
+
+    def search(self, **params):
+        return self.client.get(reverse('articles:articles-search'), params)
+
+    def slugs(self, response):
+        return [article['slug'] for article in response.data['Articles']]
+
+    def test_title_matches_rank_first(self):
+        """Titles weigh more than descriptions and bodies"""
+        in_body = self.publish('Gardening', body='growing django apps')
+        in_title = self.publish('Django tips')
+        self.publish('Cooking')
+        response = self.search(q='django')
+        self.assertEqual(self.slugs(response), [in_title.slug, in_body.slug])
+        ranks = [article['search_rank']
+                 for article in response.data['Articles']]
+        self.assertGreater(ranks[0], ranks[1])
+
+    def test_every_word_must_match(self):
+        """Articles missing a query word are left out"""
+        both = self.publish('Django and Postgres')
+        self.publish('Django and SQLite')
+        self.assertEqual(self.slugs(self.search(q='postgres django')),
+                         [both.slug])
+
+    def test_snippets_highlight_matches(self):
+        """Each result carries a highlighted excerpt of its body"""
+        self.publish('Notes', body='we moved the search index to postgres')
+        article = self.search(q='index').data['Articles'][0]
+        self.assertIn('<mark>index</mark>', article['snippet'])
+
+    def test_snippets_escape_the_body(self):
+        """Markup in the body never reaches the snippet unescaped"""
+        self.publish('Notes', body='<script>alert(1)</script> index & co')
+        snippet = self.search(q='index').data['Articles'][0]['snippet']
+        self.assertNotIn('<script>', snippet)
+        self.assertIn('&lt;script&gt;', snippet)
+        self.assertIn('<mark>index</mark> &amp; co', snippet)
+
+    def test_results_are_paginated(self):
+        """Search results are paged with cursors"""
+        for number in range(3):
+            self.publish(f'Search result {number}')
+        response = self.search(q='search', limit=2)
+        self.assertEqual(len(response.data['Articles']), 2)
+        response = self.client.get(response.data['next'])
+        self.assertEqual(len(response.data['Articles']), 1)
+        self.assertIsNone(response.data['next'])
+
+    def test_index_follows_edits_and_deletes(self):
+        """Edited and deleted articles are re-indexed"""
+        article = self.publish('Original title')
+        self.assertEqual(self.slugs(self.search(q='original')),
+                         [article.slug])
+        article.title = 'Renamed'
+        article.save()
+        self.assertEqual(self.slugs(self.search(q='original')), [])
+        self.assertEqual(self.slugs(self.search(q='renamed')),
+                         [article.slug])
+        article.delete()
+        self.assertEqual(self.slugs(self.search(q='renamed')), [])
+
+    def test_query_is_required(self):
+        """Searching for nothing is rejected"""
+        self.assertEqual(self.search(q=' ').status_code, 400)
+
+    @skipUnless(connection.vendor == 'postgresql', 'needs PostgreSQL')
+    def test_trigger_maintains_search_vector(self):
+        """The stored vector is written by the database"""
+        article = self.publish('Vector', body='lexemes')
+        vector = Article.objects.filter(pk=article.pk).values_list(
+            'search_vector', flat=True).get()
+        self.assertIn("'lexem'", vector)
@@ -0,0 +1,60 @@
+from django.db import IntegrityError, connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from authors.apps.articles.models import Article, SlugSequence
+from authors.apps.authentication.models import User
+
+
+class TestSlugAllocation(TestCase):
+    """Tests for allocating article slugs from per-title sequences"""
+
+    def setUp(self):
+        self.author = User.objects.create_user(
+            'writer', 'writer@example.com', 'password')
+
+    def create(self, title='Hello World'):
+        return Article.objects.create(
+            title=title, description='d', body='b', author=self.author)
+
+    def test_same_title_gets_numbered_slugs(self):
+        """Repeated titles are suffixed in order"""
+        slugs = [self.create().slug for _ in range(3)]
+        self.assertEqual(slugs, ['hello-world', 'hello-world-1',
+                                 'hello-world-2'])
+
+    def test_query_count_does_not_grow(self):
+        """The N-th article with a title costs no more than the second"""
+        self.create()
+        self.create()
+
+        def count_queries():
+            with CaptureQueriesContext(connection) as queries:
+                self.create()
+            return len(queries)
+
+        second = count_queries()
+        for _ in range(5):
+            self.create()
+        self.assertEqual(count_queries(), second)
+
+    def test_sequence_seeded_from_existing_slugs(self):
+        """Slugs taken before the sequence existed are skipped"""
+        self.create()
+        self.create()
+        SlugSequence.objects.all().delete()
+        self.assertEqual(self.create().slug, 'hello-world-2')
+
+    def test_colliding_slug_is_retried(self):
+        """A slug taken by another title is skipped on insert"""
+        self.create()
+        self.create('Hello World 1')
+        self.assertEqual(self.create().slug, 'hello-world-2')
+
+    def test_other_integrity_errors_are_not_retried(self):
+        """A failure unrelated to the slug uses up no further suffixes"""
+        self.create()
+        with self.assertRaises(IntegrityError):
+            Article.objects.create(title='Hello World', description='d',
+                                   body=None, author=self.author)
+        self.assertEqual(SlugSequence.objects.get().last, 1)
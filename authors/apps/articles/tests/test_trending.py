@@ -0,0 +1,81 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from authors.apps.articles import trending
+from authors.apps.articles.models import (
+    Article, Comment, Favorite, Rating, TrendingActivity, TrendingScore)
+from authors.apps.authentication.models import User
+
+WEIGHTS = {'like': 1.0, 'favorite': 2.0, 'rating': 1.5, 'comment': 3.0}
+
+
+@override_settings(TRENDING_WEIGHTS=WEIGHTS, TRENDING_HALF_LIFE=3600)
+class TrendingTestCase(TestCase):
+    """Tests for the time-decayed trending articles"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            'reader', 'reader@example.com', 'password')
+        self.quiet, self.busy = [
+            Article.objects.create(title=title, description='d', body='b',
+                                   author=self.user)
+            for title in ('quiet', 'busy')]
+
+    def test_activity_is_logged_and_folded(self):
+        """Each kind of activity adds its weight once"""
+        self.client.force_authenticate(self.user)
+        self.client.patch(reverse('articles:like_article',
+                                  args=[self.busy.slug]))
+        Favorite.objects.create(article=self.busy, user=self.user)
+        Rating.objects.create(article=self.busy, user=self.user,
+                              user_rating=4)
+        Comment.objects.create(article=self.quiet, author=self.user,
+                               body='hi')
+        self.assertEqual(TrendingActivity.objects.count(), 4)
+
+        top = trending.refresh()
+        self.assertEqual([slug for slug, _ in top],
+                         [self.busy.slug, self.quiet.slug])
+        self.assertAlmostEqual(dict(top)[self.busy.slug], 4.5, places=2)
+        self.assertFalse(TrendingActivity.objects.exists())
+
+        # a second run adds nothing new
+        trending.refresh()
+        self.assertAlmostEqual(
+            TrendingScore.objects.get(pk=self.busy.pk).score, 4.5, places=2)
+
+    def test_scores_decay_between_runs(self):
+        """Scores halve every half-life and old activity drops off"""
+        Comment.objects.create(article=self.quiet, author=self.user,
+                               body='hi')
+        now = timezone.now()
+        trending.refresh(now)
+        Favorite.objects.create(article=self.busy, user=self.user)
+        top = dict(trending.refresh(now + timedelta(hours=1)))
+        self.assertAlmostEqual(top[self.quiet.slug], 1.5, places=2)
+        # logged now, so already an hour old at the second run
+        self.assertAlmostEqual(top[self.busy.slug], 1.0, places=2)
+
+        top = dict(trending.refresh(now + timedelta(days=2)))
+        self.assertEqual(top, {})
+
+    def test_endpoint_serves_cached_list(self):
+        """The endpoint reads the cached top list, not the score table"""
+        Favorite.objects.create(article=self.busy, user=self.user)
+        trending.refresh()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('articles:articles-trending'))
+        self.assertEqual([article['slug'] for article in response.data],
+                         [self.busy.slug])
+        self.assertIn('trending_score', response.data[0])
+        self.assertNotIn('articles_trendingscore',
+                         ' '.join(query['sql'] for query in queries))
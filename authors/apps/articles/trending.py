@@ -0,0 +1,83 @@
+"""
+Trending articles.
+
+Every article's score is the sum of the weights of its likes, favorites,
+ratings and comments, each decaying exponentially with its age. The score
+is refreshed incrementally: a run decays the stored scores by the time
+elapsed since the previous run and adds the activity logged since, so its
+cost follows the recent activity rather than the size of the tables.
+"""
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import TrendingActivity, TrendingRun, TrendingScore
+
+TOP_KEY = 'trending:top'
+
+
+def decay(seconds):
+    """The factor a score shrinks by over `seconds`"""
+    return 0.5 ** (seconds / settings.TRENDING_HALF_LIFE)
+
+
+def refresh(now=None, chunk_size=1000):
+    """
+    Fold the activity logged since the last run into the scores, caching
+    and returning the new top list
+    """
+    now = now or timezone.now()
+    weights = settings.TRENDING_WEIGHTS
+    with transaction.atomic():
+        # locking the run row keeps concurrent refreshes from folding the
+        # same activity twice
+        run = TrendingRun.objects.select_for_update().first()
+        if run is None:
+            run = TrendingRun.objects.create(ran_at=now)
+        elapsed = max((now - run.ran_at).total_seconds(), 0)
+        TrendingScore.objects.update(score=F('score') * decay(elapsed))
+
+        deltas = defaultdict(float)
+        folded = []
+        for pk, article_id, kind, created_at in TrendingActivity.objects \
+                .filter(created_at__lte=now).order_by() \
+                .values_list('pk', 'article_id', 'kind', 'created_at') \
+                .iterator():
+            age = max((now - created_at).total_seconds(), 0)
+            deltas[article_id] += weights.get(kind, 0) * decay(age)
+            folded.append(pk)
+
+        for article_id, delta in deltas.items():
+            if not TrendingScore.objects.filter(article_id=article_id) \
+                    .update(score=F('score') + delta):
+                TrendingScore.objects.create(
+                    article_id=article_id, score=delta)
+        TrendingScore.objects.filter(
+            score__lt=settings.TRENDING_MIN_SCORE).delete()
+        for start in range(0, len(folded), chunk_size):
+            TrendingActivity.objects.filter(
+                pk__in=folded[start:start + chunk_size]).delete()
+
+        run.ran_at = now
+        run.save(update_fields=['ran_at'])
+    return cache_top()
+
+
+def cache_top():
+    """Read the top scores from their index and cache them"""
+    top = list(TrendingScore.objects.order_by('-score', 'article_id')
+               .values_list('article_id', 'score')[:settings.TRENDING_SIZE])
+    cache.set(TOP_KEY, top, settings.TRENDING_CACHE_TIMEOUT)
+    return top
+
+
+def top():
+    """(slug, score) pairs of the trending articles, highest first"""
+    cached = cache.get(TOP_KEY)
+    if cached is None:
+        cached = cache_top()
+    return cached
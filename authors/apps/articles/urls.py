@@ -7,10 +7,19 @@ app_name = "articles"
 urlpatterns = [
     path('articles/', views.ArticleViewSet.as_view(
         {'get': 'list', "post": "create"}), name='articles-all'),
+    path('articles/batch', views.ArticleBatchAPIView.as_view(),
+         name='articles-batch'),
+    path('articles/search', views.ArticleSearchAPIView.as_view(),
+         name='articles-search'),
+    path('articles/trending', views.TrendingArticlesAPIView.as_view(),
+         name='articles-trending'),
+    path('feed/', views.ArticleFeedAPIView.as_view(), name='feed'),
     path('articles/<pk>/', views.ArticleViewSet.as_view(
         {"get": "retrieve", "put": "update", "patch": "partial_update",
          "delete": "destroy"}), name='single-article'),
     path('rate/<slug>/', views.RatingAPIView.as_view(), name='rating'),
+    path('ratings/summary/', views.RatingSummaryAPIView.as_view(),
+         name='ratings-summary'),
     path('articles/<pk>/like/', views.LikeViewSet.as_view(
         {"patch": "partial_update"}), name='like_article'),
     path('articles/<pk>/dislike/', views.DisLikeViewSet.as_view(
@@ -1,15 +1,31 @@
-from django.db.models import Avg
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.http import Http404
 from django.shortcuts import get_object_or_404
+from django.urls import reverse
 from rest_framework import status, viewsets
 from rest_framework.exceptions import NotFound
 from rest_framework.generics import GenericAPIView
-from rest_framework.permissions import IsAuthenticatedOrReadOnly
+from rest_framework.permissions import (
+    AllowAny, IsAuthenticated, IsAuthenticatedOrReadOnly)
 from rest_framework.response import Response
-from .models import Article, Comment, Rating, Favorite
+from authors.apps.core.conditional import conditional, make_etag
+from .models import (
+    Article, Comment, Rating, RatingSummary, Favorite, TimelineEntry,
+    TrendingActivity)
+from .pagination import (
+    ArticleCursorPagination, CommentCursorPagination, FeedCursorPagination,
+    ReplyCursorPagination, SearchCursorPagination, TimelineCursorPagination)
 from .renderers import ArticleJsonRenderer, FavoriteJsonRenderer
+from . import trending
+from .cache import article_cache
+from .search import SCORE_SCALE, get_search_backend
 from .serializers import (
-    ArticleSerializer, CommentSerializer, RatingSerializer,
-    FavoriteInfoSerializer, FavoriteInputSerializer)
+    ArticleFilterSerializer, ArticleSerializer, CommentSerializer,
+    RatingSerializer, RatingSummarySerializer, FavoriteInfoSerializer,
+    FavoriteInputSerializer)
 
 
 def get_article(slug):
@@ -23,6 +39,83 @@ def get_article(slug):
         )
 
 
+def list_filters(request):
+    """The validated `?sort=` order and filters of the article list"""
+    filters = ArticleFilterSerializer(data=request.query_params)
+    filters.is_valid(raise_exception=True)
+    criteria = dict(filters.validated_data)
+    return criteria.pop('sort', None), criteria
+
+
+def article_list_validators(view, request):
+    """
+    An ETag for a page of the article list, from the timestamps of the
+    articles on it and of their authors. There is no Last-Modified: an
+    article deleted from the page leaves no newer timestamp behind.
+    """
+    sort, criteria = list_filters(request)
+    paginator = ArticleCursorPagination(sort)
+    queryset = Article.objects.filter_by(**criteria).select_related('author') \
+        .only('slug', 'created_at', 'updated_at', 'counted_at',
+              'likes_count', 'favorites_count', 'average_rating',
+              'author__updated_at')
+    page = paginator.paginate_queryset(queryset, request, view=view)
+    rows = [(article.slug, article.updated_at, article.counted_at,
+             article.author and article.author.updated_at)
+            for article in page]
+    etag = make_etag(rows, list(paginator.get_links().values()),
+                     request.user.id, request.query_params.urlencode())
+    return etag, None
+
+
+def article_validators(view, request, pk=None):
+    """
+    The ETag and Last-Modified of one article, from its timestamps,
+    counters and author, read without loading the article itself
+    """
+    row = Article.objects.filter(pk=pk).values(
+        'updated_at', 'counted_at', 'author__updated_at', 'likes_count',
+        'dislikes_count', 'favorites_count', 'comments_count',
+        'average_rating').first()
+    if row is None:
+        return None, None
+    last_modified = max(filter(None, (
+        row['updated_at'], row['counted_at'], row['author__updated_at'])))
+    etag = make_etag(pk, sorted(row.items()), request.user.id,
+                     request.query_params.urlencode())
+    return etag, last_modified
+
+
+def author_of(slug):
+    """The id of the article's author, or 404 if there is no article"""
+    authors = Article.objects.filter(pk=slug).values_list(
+        'author_id', flat=True)
+    if not authors:
+        raise Http404
+    return authors[0]
+
+
+def shared_representation(slug):
+    """The article serialized without the fields that vary by viewer"""
+    fields = [name for name in ArticleSerializer.Meta.fields
+              if name not in article_cache.viewer_fields]
+    article = get_object_or_404(
+        Article.objects.for_serializer(fields=fields), pk=slug)
+    return ArticleSerializer(article, fields=fields).data
+
+
+def viewer_representation(slug, user, fields):
+    """The requested fields that depend on the viewer"""
+    names = [name for name in article_cache.viewer_fields
+             if fields is None or name in fields]
+    if not names:
+        return {}
+    if not user.is_authenticated:
+        return dict.fromkeys(names, False)
+    state = Article.objects.filter(pk=slug).viewer_state(user).first() or {}
+    return {name: state.get(name, False) for name in names}
+
+
 class ArticleViewSet(viewsets.ViewSet):
     """
     Example empty viewset demonstrating the standard
@@ -35,12 +128,19 @@ class ArticleViewSet(viewsets.ViewSet):
     serializer_class = ArticleSerializer
     permission_classes = (IsAuthenticatedOrReadOnly,)
     renderer_classes = (ArticleJsonRenderer,)
+    pagination_class = ArticleCursorPagination
 
+    @conditional(article_list_validators)
     def list(self, request):
-        queryset = Article.objects.order_by("created_at")
+        sort, criteria = list_filters(request)
+        paginator = self.pagination_class(sort)
+        fields = ArticleSerializer.requested_fields(request)
+        queryset = Article.objects.for_serializer(request.user, fields) \
+            .filter_by(**criteria)
+        page = paginator.paginate_queryset(queryset, request, view=self)
         serializer = ArticleSerializer(
-            queryset, many=True, context={'request': request})
-        return Response({"Articles": serializer.data})
+            page, many=True, fields=fields, context={'request': request})
+        return paginator.get_paginated_response(serializer.data)
 
     def create(self, request):
         """create an article"""
@@ -51,15 +151,19 @@ class ArticleViewSet(viewsets.ViewSet):
         serializer.save(author=request.user)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
+    @conditional(article_validators)
     def retrieve(self, request, pk=None):
         """
         Returns article with the given slug if exists
         or returns an exception if no article with slug exists
         """
-        queryset = Article.objects.all()
-        article = get_object_or_404(queryset, pk=pk)
-        serializer = ArticleSerializer(article, context={'request': request})
-        return Response(serializer.data)
+        fields = ArticleSerializer.requested_fields(request)
+        shared = article_cache.fetch(
+            pk, author_of, lambda: shared_representation(pk))
+        shared.update(viewer_representation(pk, request.user, fields))
+        return Response(OrderedDict(
+            (name, shared[name]) for name in ArticleSerializer.Meta.fields
+            if fields is None or name in fields))
 
     def update(self, request, pk=None):
         """
@@ -117,18 +221,22 @@ class RatingAPIView(GenericAPIView):
                 "message": "You cannot rate your own article"
             }, status=status.HTTP_403_FORBIDDEN)
 
-        try:
-            current_rating = Rating.objects.get(
-                user=request.user.id,
-                article=article
-            )
-            serializer = self.serializer_class(
-                current_rating, data=rating)
-        except Rating.DoesNotExist:
-            serializer = self.serializer_class(data=rating)
-
-        serializer.is_valid(raise_exception=True)
-        serializer.save(user=request.user, article=article)
+        with transaction.atomic():
+            try:
+                current_rating = Rating.objects.select_for_update().get(
+                    user=request.user.id,
+                    article=article
+                )
+                previous = current_rating.user_rating
+                serializer = self.serializer_class(
+                    current_rating, data=rating)
+            except Rating.DoesNotExist:
+                previous = None
+                serializer = self.serializer_class(data=rating)
+
+            serializer.is_valid(raise_exception=True)
+            saved = serializer.save(user=request.user, article=article)
+            RatingSummary.record(article, saved.user_rating, previous)
 
         return Response({
             'message': 'Rating submitted sucessfully',
@@ -146,11 +254,7 @@ class RatingAPIView(GenericAPIView):
             rating = None
 
         if rating is None:
-            avg = Rating.objects.filter(
-                article=article).aggregate(Avg('user_rating'))
-            average_rating = avg['user_rating__avg']
-            if avg["user_rating__avg"] is None:
-                average_rating = 0
+            average_rating = RatingSummary.of(article).average
 
             if request.user.is_authenticated is False:
                 return Response({
@@ -175,48 +279,262 @@ class RatingAPIView(GenericAPIView):
         }, status=status.HTTP_200_OK)
 
 
-def check_if_article_exists(request, pk, action):
-    article = get_article(pk)
-    if request.user in article.liked_by.all():
-        request.user.likes.remove(article)
-    else:
-        if action == 'like':
-            request.user.likes.add(article)
-    if request.user in article.disliked_by.all():
-        request.user.dislikes.remove(article)
-    else:
-        if action == 'dislike':
-            request.user.dislikes.add(article)
-    return article
+class ArticleFeedAPIView(GenericAPIView):
+    """
+    Articles by the authors the current user follows, newest first.
 
+    ARTICLE_FEED_STRATEGY picks between merging the followed authors'
+    articles on every request and reading the timeline the notification
+    worker writes when an article is published.
+    """
+    serializer_class = ArticleSerializer
+    permission_classes = (IsAuthenticated,)
+    renderer_classes = (ArticleJsonRenderer,)
 
-class LikeViewSet(viewsets.ViewSet):
+    def get(self, request):
+        fields = self.serializer_class.requested_fields(request)
+        if settings.ARTICLE_FEED_STRATEGY == 'write':
+            paginator, page = self.read_timeline(request, fields)
+        else:
+            paginator = FeedCursorPagination()
+            page = paginator.paginate_queryset(
+                Article.objects.for_serializer(request.user, fields)
+                .followed_by(request.user), request, view=self)
+        serializer = self.serializer_class(
+            page, many=True, fields=fields, context={'request': request})
+        return paginator.get_paginated_response(serializer.data)
+
+    def read_timeline(self, request, fields):
+        paginator = TimelineCursorPagination()
+        entries = paginator.paginate_queryset(
+            TimelineEntry.objects.filter(user=request.user), request,
+            view=self)
+        articles = Article.objects.for_serializer(request.user, fields) \
+            .in_bulk([entry.article_id for entry in entries])
+        return paginator, [articles[entry.article_id] for entry in entries
+                           if entry.article_id in articles]
+
+
+class ArticleSearchAPIView(GenericAPIView):
+    """
+    Articles matching every word of `q` in their title, description or
+    body, most relevant first, each with a highlighted body snippet
+    """
+    serializer_class = ArticleSerializer
+    permission_classes = (AllowAny,)
+    renderer_classes = (ArticleJsonRenderer,)
+    pagination_class = SearchCursorPagination
+
+    def get(self, request):
+        terms = request.query_params.get('q', '').strip()
+        if not terms:
+            return Response({
+                "error": "Provide the words to search for as q"
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        backend = get_search_backend()
+        fields = self.serializer_class.requested_fields(request)
+        queryset = backend.search(
+            Article.objects.for_serializer(request.user, fields), terms)
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        backend.highlight(page, terms)
+
+        serializer = self.serializer_class(
+            page, many=True, fields=fields, context={'request': request})
+        results = [
+            dict(data, search_rank=article.search_score / SCORE_SCALE,
+                 snippet=article.snippet)
+            for article, data in zip(page, serializer.data)]
+        return paginator.get_paginated_response(results)
+
+
+class TrendingArticlesAPIView(GenericAPIView):
+    """
+    The most active articles of late, highest score first. The list is
+    computed by `manage.py refresh_trending` and served from the cache.
+    """
     serializer_class = ArticleSerializer
-    permissions = (IsAuthenticatedOrReadOnly,)
+    permission_classes = (AllowAny,)
+    renderer_classes = (ArticleJsonRenderer,)
+
+    def get(self, request):
+        scores = trending.top()
+        fields = self.serializer_class.requested_fields(request)
+        articles = Article.objects.for_serializer(request.user, fields) \
+            .in_bulk([slug for slug, _ in scores])
+        scores = [(articles[slug], score) for slug, score in scores
+                  if slug in articles]
+        serializer = self.serializer_class(
+            [article for article, _ in scores], many=True, fields=fields,
+            context={'request': request})
+        return Response([
+            dict(data, trending_score=round(score, 3))
+            for data, (_, score) in zip(serializer.data, scores)
+        ], status=status.HTTP_200_OK)
+
+
+def split_slugs(value):
+    """Article slugs given as a list or a comma separated string"""
+    if isinstance(value, str):
+        value = value.split(',')
+    if not isinstance(value, list):
+        return []
+    return [str(slug).strip() for slug in value if str(slug).strip()]
+
+
+def check_slugs(slugs, max_slugs):
+    """An error response if `slugs` is empty or too long, else None"""
+    if not slugs:
+        return Response({
+            "error": "Provide a comma separated list of article slugs"
+        }, status=status.HTTP_400_BAD_REQUEST)
+    if len(slugs) > max_slugs:
+        return Response({
+            "error": f"At most {max_slugs} slugs can be requested"
+        }, status=status.HTTP_400_BAD_REQUEST)
+    return None
+
+
+class ArticleBatchAPIView(GenericAPIView):
+    """
+    Articles for a list of slugs, loaded as one planned queryset and
+    returned in the requested order. Slugs without an article get a
+    not-found marker in their place.
+    """
+    serializer_class = ArticleSerializer
+    permission_classes = (AllowAny,)
+    renderer_classes = (ArticleJsonRenderer,)
+    max_slugs = 100
+
+    def get(self, request):
+        return self.batch(request, request.query_params.get('slugs'))
+
+    def post(self, request):
+        """
+        Same as GET, for slug lists too long for a query string. The body
+        is `{"slugs": [...]}` or the bare list.
+        """
+        slugs = request.data
+        if isinstance(slugs, dict):
+            slugs = slugs.get('slugs')
+        return self.batch(request, slugs if isinstance(slugs, list) else None)
+
+    def batch(self, request, slugs):
+        slugs = split_slugs(slugs)
+        error = check_slugs(slugs, self.max_slugs)
+        if error:
+            return error
+
+        fields = self.serializer_class.requested_fields(request)
+        articles = Article.objects.for_serializer(request.user, fields) \
+            .in_bulk(slugs)
+        serializer = self.serializer_class(
+            [articles[slug] for slug in slugs if slug in articles],
+            many=True, fields=fields, context={'request': request})
+        found = iter(serializer.data)
+        return Response([
+            next(found) if slug in articles
+            else {"slug": slug, "error": "Article not found"}
+            for slug in slugs
+        ], status=status.HTTP_200_OK)
+
+
+class RatingSummaryAPIView(GenericAPIView):
+    """Rating summaries for a list of articles in a single query"""
+    serializer_class = RatingSummarySerializer
+    permission_classes = (IsAuthenticatedOrReadOnly,)
+    max_slugs = 100
+
+    def get(self, request):
+        slugs = split_slugs(request.query_params.get('slugs'))
+        error = check_slugs(slugs, self.max_slugs)
+        if error:
+            return error
+
+        articles = Article.objects.filter(slug__in=slugs).select_related(
+            'rating_summary')
+        summaries = {article.slug: RatingSummary.of(article)
+                     for article in articles}
+        serializer = self.serializer_class(
+            [summaries[slug] for slug in slugs if slug in summaries],
+            many=True)
+        return Response({'ratings': serializer.data},
+                        status=status.HTTP_200_OK)
+
+
+def toggle_reaction(request, pk, action):
+    """
+    Like or dislike an article for the current user, undoing the opposite
+    reaction. Membership is tested with keyed DELETEs on the through
+    tables instead of loading every liker, and the counters move by the
+    rows actually changed.
+    """
+    article = Article.objects.only(
+        'slug', 'likes_count', 'dislikes_count').filter(pk=pk).first()
+    if article is None:
+        raise NotFound({"error": "Article not found"})
+
+    reactions = {
+        'like': Article.liked_by.through.objects.filter(
+            article_id=article.pk, user_id=request.user.id),
+        'dislike': Article.disliked_by.through.objects.filter(
+            article_id=article.pk, user_id=request.user.id),
+    }
+    chosen = reactions.pop(action)
+    opposite, = reactions.values()
+    with transaction.atomic():
+        opposite_removed, _ = opposite.delete()
+        removed, _ = chosen.delete()
+        added = 0
+        reacted = False
+        if not removed:
+            try:
+                with transaction.atomic():
+                    chosen.model.objects.create(
+                        article_id=article.pk, user_id=request.user.id)
+                added = 1
+                reacted = True
+                if action == 'like':
+                    TrendingActivity.objects.create(
+                        article_id=article.pk, kind=TrendingActivity.LIKE)
+            except IntegrityError:
+                # only a concurrent request from the same user inserting
+                # the row first is expected; anything else is an error
+                if not chosen.exists():
+                    raise
+                reacted = True
+        changed, other = ('likes_count', 'dislikes_count') \
+            if action == 'like' else ('dislikes_count', 'likes_count')
+        article.adjust_counters(**{changed: added - removed,
+                                   other: -opposite_removed})
+    # read the counters back once committed, with everyone else's
+    # reactions, rather than trusting the copy loaded before the UPDATE
+    article.refresh_from_db(fields=['likes_count', 'dislikes_count'])
+
+    return Response({
+        'slug': article.slug,
+        'likes_count': article.likes_count,
+        'dislikes_count': article.dislikes_count,
+        'like_status': action == 'like' and reacted,
+        'dislike_status': action == 'dislike' and reacted,
+    }, status.HTTP_200_OK)
+
+
+class LikeViewSet(viewsets.ViewSet):
+    permission_classes = (IsAuthenticated,)
 
     def partial_update(self, request, pk=None):
         """Update likes field."""
-        article = check_if_article_exists(request, pk, 'like')
-        serializer = self.serializer_class(article,
-                                           context={
-                                               'request': request},
-                                           partial=True)
-        return Response(serializer.data, status.HTTP_200_OK)
+        return toggle_reaction(request, pk, 'like')
 
 
 class DisLikeViewSet(viewsets.ViewSet):
-    serializer_class = ArticleSerializer
-    permission_classes = (IsAuthenticatedOrReadOnly,)
+    permission_classes = (IsAuthenticated,)
 
     def partial_update(self, request, pk=None):
         """Update dislikes field."""
-        article = check_if_article_exists(request, pk, 'dislike')
-
-        serializer = self.serializer_class(article,
-                                           context={
-                                               'request': request},
-                                           partial=True)
-        return Response(serializer.data, status.HTTP_200_OK)
+        return toggle_reaction(request, pk, 'dislike')
 
 
 class CommentViewSet(viewsets.ViewSet):
@@ -229,6 +547,7 @@ class CommentViewSet(viewsets.ViewSet):
     serializer_class = CommentSerializer
     permission_classes = (IsAuthenticatedOrReadOnly,)
     renderer_classes = (ArticleJsonRenderer,)
+    pagination_class = CommentCursorPagination
 
     def get_specific_comment(self, article_id, comment_id, request):
         """This methos a single comment related to a specific article"""
@@ -247,22 +566,27 @@ class CommentViewSet(viewsets.ViewSet):
     def list(self, request, **kwargs):
         """This is the endpoint to view all article comments"""
         article_id = self.kwargs['pk']
-        get_article(article_id)
+        article = get_article(article_id)
 
-        try:
-            comments = Comment.objects.filter(article_id=article_id,
-                                              parent=None).order_by(
-                '-created_at')
-        except Exception:
-            return Response({"error": "No comments found"},
-                            status=status.HTTP_404_NOT_FOUND)
+        paginator = self.pagination_class()
+        inline = settings.COMMENT_INLINE_REPLIES
+        comments = paginator.paginate_queryset(
+            Comment.objects.filter(article=article).threads(inline),
+            request, view=self)
+        replies = ReplyCursorPagination(inline)
+        for comment in comments:
+            # every thread belongs to the article loaded above
+            comment.article = article
+            comment.replies_cursor = None
+            if comment.reply_count > len(comment.replies):
+                comment.replies_cursor = replies.link_after(
+                    request.build_absolute_uri(reverse(
+                        'articles:single-comment',
+                        kwargs={'pk': article.pk, 'id': comment.pk})),
+                    comment.replies[-1] if comment.replies else None)
 
         serializer = self.serializer_class(comments, many=True)
-        return Response(
-            {
-                'Comments': serializer.data
-            }
-        )
+        return paginator.get_paginated_response(serializer.data)
 
     def create(self, request, **kwargs):
         """This is the view for creating a new comment"""
@@ -274,7 +598,9 @@ class CommentViewSet(viewsets.ViewSet):
             data=comment, context={'request': request}
         )
         serializer.is_valid(raise_exception=True)
-        serializer.save(article=article, author=request.user)
+        with transaction.atomic():
+            serializer.save(article=article, author=request.user)
+            article.adjust_counters(comments_count=1)
 
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
@@ -286,6 +612,11 @@ class CommentViewSet(viewsets.ViewSet):
         )
         if isinstance(comment, Response):
             return comment
+        replies = ReplyCursorPagination()
+        comment.replies = replies.paginate_queryset(
+            Comment.objects.filter(article_id=article_id, parent=comment)
+            .select_related('author'), request, view=self)
+        comment.replies_cursor = replies.get_next_link()
         serializer = self.serializer_class(comment)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -322,7 +653,12 @@ class CommentViewSet(viewsets.ViewSet):
                 "error": "You are not the author of this comment"
             },
                 status=status.HTTP_401_UNAUTHORIZED)
-        comment.delete()
+        with transaction.atomic():
+            comment.delete()
+            if comment.parent:
+                comment.parent.adjust_counters(reply_count=-1)
+            comment.article.adjust_counters(
+                comments_count=-(1 + comment.reply_count))
         return Response({
             "message": "Comment deleted successfully"
         },
@@ -347,7 +683,11 @@ class CommentViewSet(viewsets.ViewSet):
             },
                 status=status.HTTP_400_BAD_REQUEST)
         serializer.is_valid(raise_exception=True)
-        serializer.save(article=article, author=request.user, parent=comment)
+        with transaction.atomic():
+            serializer.save(
+                article=article, author=request.user, parent=comment)
+            comment.adjust_counters(reply_count=1)
+            article.adjust_counters(comments_count=1)
 
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
@@ -373,7 +713,9 @@ class FavoriteViewSet(viewsets.ViewSet):
         data = {"article": article.pk, "user": self.request.user.id}
         serializer = FavoriteInputSerializer(data=data)
         serializer.is_valid(raise_exception=True)
-        serializer.save()
+        with transaction.atomic():
+            serializer.save()
+            article.adjust_counters(favorites_count=1)
         return Response({'message': 'article added to favorites'},
                         status.HTTP_201_CREATED)
 
@@ -382,13 +724,17 @@ class FavoriteViewSet(viewsets.ViewSet):
         instance = Favorite.objects.filter(
             article=article.pk, user=request.user)
         if instance.exists():
-            instance.delete()
+            with transaction.atomic():
+                deleted, _ = instance.delete()
+                article.adjust_counters(favorites_count=-deleted)
             return Response({'message': 'article removed from favorites'},
                             status.HTTP_200_OK)
         return Response({'message': 'article not in favorites'},
                         status.HTTP_404_NOT_FOUND)
 
     def list(self, request):
-        queryset = Favorite.objects.filter(user=request.user)
-        serializer = self.serializer_class(queryset, many=True)
+        queryset = Favorite.objects.filter(
+            user=request.user).select_related('article')
+        serializer = self.serializer_class(
+            queryset, many=True, context={'request': request})
         return Response(serializer.data, status=status.HTTP_200_OK)
@@ -1,10 +1,12 @@
-import jwt
+import time
 
-from django.conf import settings
+import jwt
 
 from rest_framework import authentication, exceptions
 
+from .cache import user_cache
 from .models import User
+from .tokens import token_verifier
 
 
 class JWTAuthentication(authentication.BaseAuthentication):
@@ -15,6 +17,17 @@ class JWTAuthentication(authentication.BaseAuthentication):
     def authenticate(self, request):
         """Checks authorization on every request."""
 
+        started = time.perf_counter()
+        self.cached = False
+        try:
+            return self._authenticate(request)
+        finally:
+            # Read back by AuthTimingMiddleware for the Server-Timing header
+            http_request = getattr(request, '_request', request)
+            http_request.auth_timing = (
+                (time.perf_counter() - started) * 1000, self.cached)
+
+    def _authenticate(self, request):
         request.user = None
         auth_header = authentication.get_authorization_header(request).split()
 
@@ -43,15 +56,27 @@ class JWTAuthentication(authentication.BaseAuthentication):
         """Authenticate the provided credentials."""
 
         try:
-            payload = jwt.decode(token, settings.SECRET_KEY)
-        except exceptions.AuthenticationFailed:
+            payload, token_cached = token_verifier.verify_with_status(token)
+        except jwt.ExpiredSignatureError:
+            message = "Token has expired"
+            raise exceptions.AuthenticationFailed(message)
+        except jwt.InvalidTokenError:
             message = "Could not decode token"
             raise exceptions.AuthenticationFailed(message)
 
-        try:
-            user = User.objects.get(username=payload['username'])
-        except exceptions.AuthenticationFailed:
-            message = "No user matching this token was found"
+        username = payload.get('username')
+        if username is None:
+            message = "Could not decode token"
             raise exceptions.AuthenticationFailed(message)
 
+        user = user_cache.get(username)
+        self.cached = token_cached and user is not None
+        if user is None:
+            try:
+                user = User.objects.get(username=username)
+            except User.DoesNotExist:
+                message = "No user matching this token was found"
+                raise exceptions.AuthenticationFailed(message)
+            user_cache.set(user)
+
         return (user, token)
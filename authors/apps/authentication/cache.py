@@ -0,0 +1,188 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import router, transaction
+from django.db.models import Prefetch
+
+from authors.apps.core.cache import LRUCache
+
+
+class AuthUserCache:
+    """
+    Users resolved by `JWTAuthentication`, cached between requests.
+
+    Entries are keyed by the username carried in the token and hold the
+    user's column values, less the password hash, so every hit builds a
+    fresh `User` that a request can modify freely and that loads its
+    password only if asked for it. They live in an in-process LRU and,
+    when `AUTH_USER_CACHE['BACKEND']` names a cache alias, in that shared
+    cache too, next to a per-user version that saving or deleting the
+    user removes. A local hit is only trusted while the shared version is
+    still the one it was stored under, so every process sees the change
+    on its next request; without a shared cache other processes keep
+    their copy for up to `AUTH_USER_CACHE['TIMEOUT']` seconds. Changes
+    made with `QuerySet.update()` are only picked up once entries expire.
+    """
+    key_prefix = 'auth-user'
+    excluded_fields = ('password',)
+
+    def __init__(self):
+        config = settings.AUTH_USER_CACHE
+        self.enabled = config['ENABLED']
+        self.timeout = config['TIMEOUT']
+        self.local = LRUCache(config['MAX_SIZE'], self.timeout)
+        self.backend_alias = config['BACKEND']
+
+    @property
+    def shared(self):
+        return caches[self.backend_alias] if self.backend_alias else None
+
+    def key(self, username):
+        return f'{self.key_prefix}:{username}'
+
+    def version_key(self, user_id):
+        return f'{self.key_prefix}-version:{user_id}'
+
+    def get(self, username):
+        if not self.enabled:
+            return None
+        key = self.key(username)
+        entry = self.local.get(key)
+        if entry is not None and self.shared is not None and \
+                self.shared.get(self.version_key(entry['row']['id'])) != \
+                entry['version']:
+            self.local.delete(key)
+            entry = None
+        if entry is None and self.shared is not None:
+            entry = self.shared.get(key)
+            if entry is not None:
+                self.local.set(key, entry)
+        if entry is None:
+            return None
+        row = entry['row']
+        model = get_user_model()
+        return model.from_db(router.db_for_read(model), list(row),
+                             list(row.values()))
+
+    def set(self, user):
+        if not self.enabled:
+            return
+        row = {field.attname: getattr(user, field.attname)
+               for field in user._meta.concrete_fields
+               if field.attname not in self.excluded_fields}
+        entry = {'version': None, 'row': row}
+        key = self.key(user.username)
+        if self.shared is not None:
+            version_key = self.version_key(user.pk)
+            self.shared.add(version_key, time.time(), self.timeout)
+            entry['version'] = self.shared.get(version_key)
+            self.shared.set(key, entry, self.timeout)
+        self.local.set(key, entry)
+
+    def invalidate(self, user):
+        key = self.key(user.username)
+        self.local.delete(key)
+        # a renamed user is still cached under the old username
+        self.local.delete_where(lambda entry: entry['row']['id'] == user.pk)
+        if self.shared is not None:
+            self.shared.delete_many([key, self.version_key(user.pk)])
+
+
+class AuthorSummaryCache:
+    """
+    `UserSerializer` output for users shown beside what they wrote or did,
+    such as article authors and notification actors.
+
+    A lookup tries a memo kept for the current request, then the shared
+    `AUTHOR_SUMMARY_CACHE['BACKEND']` cache, then the database, where the
+    users missing from a page are loaded together in a fixed number of
+    queries. Saving a user, or a follow involving them, evicts their
+    summary; one read while such a change commits may still store the old
+    summary, for at most `AUTHOR_SUMMARY_CACHE['TIMEOUT']` seconds.
+    """
+    key_prefix = 'author-summary'
+    memo_attribute = 'author_summaries'
+
+    def __init__(self):
+        config = settings.AUTHOR_SUMMARY_CACHE
+        self.enabled = config['ENABLED']
+        self.timeout = config['TIMEOUT']
+        self.backend_alias = config['BACKEND']
+
+    @property
+    def shared(self):
+        return caches[self.backend_alias]
+
+    def key(self, user_id):
+        return f'{self.key_prefix}:{user_id}'
+
+    def get(self, user_id, context=None, batch=()):
+        """
+        The summary of `user_id`, or None for no user. On a miss the users
+        in `batch`, typically the rest of the page, are loaded alongside.
+        """
+        if user_id is None:
+            return None
+        memo = self.memo(context)
+        if user_id not in memo:
+            wanted = {user_id, *batch} - set(memo) - {None}
+            memo.update(self.get_many(wanted))
+        return memo.get(user_id)
+
+    def get_many(self, user_ids):
+        summaries = {}
+        if self.enabled and user_ids:
+            found = self.shared.get_many([self.key(pk) for pk in user_ids])
+            summaries = {pk: found[self.key(pk)] for pk in user_ids
+                         if self.key(pk) in found}
+        missing = set(user_ids) - set(summaries)
+        if missing:
+            loaded = self.load(missing)
+            if self.enabled:
+                self.shared.set_many(
+                    {self.key(pk): summary for pk, summary in loaded.items()},
+                    self.timeout)
+            summaries.update(loaded)
+        return summaries
+
+    def load(self, user_ids):
+        # imported here as the serializers import the models, which import
+        # this module
+        from .serializers import UserSerializer
+
+        ids_only = get_user_model().objects.only('id')
+        users = get_user_model().objects.filter(
+            pk__in=user_ids).prefetch_related(
+            Prefetch('followers', queryset=ids_only),
+            Prefetch('following', queryset=ids_only))
+        return {user.pk: dict(UserSerializer(user).data) for user in users}
+
+    def memo(self, context):
+        """
+        The summaries already used for the request in `context`, or for
+        the serializer owning `context` when there is no request
+        """
+        if context is None:
+            return {}
+        request = context.get('request')
+        if request is None:
+            return context.setdefault(self.memo_attribute, {})
+        # memoize on the Django request, shared by every DRF wrapper of it
+        request = getattr(request, '_request', request)
+        if not hasattr(request, self.memo_attribute):
+            setattr(request, self.memo_attribute, {})
+        return getattr(request, self.memo_attribute)
+
+    def invalidate(self, *user_ids):
+        if not self.enabled:
+            return
+        keys = [self.key(pk) for pk in user_ids]
+        self.shared.delete_many(keys)
+        # again once committed, in case a reader cached the old rows between
+        transaction.on_commit(lambda: self.shared.delete_many(keys))
+
+
+user_cache = AuthUserCache()
+author_summaries = AuthorSummaryCache()
@@ -0,0 +1,23 @@
+"""
+Recomputing the denormalized follow counts, for
+`manage.py repair_follow_counts` and the migration that added them.
+"""
+from authors.apps.core.counters import count_of, repair
+
+
+def follow_counts(user_model):
+    """
+    Correlated subqueries counting each user's followers and followings
+    on the follow table
+    """
+    follows = user_model.following.through.objects
+    return {'followers_count': count_of(follows, 'to_user'),
+            'following_count': count_of(follows, 'from_user')}
+
+
+def repair_follow_counts(user_model):
+    """
+    Rewrite every follow count that disagrees with the follow table,
+    returning how many users had drifted
+    """
+    return repair(user_model, follow_counts(user_model))
@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import RequestFactory
+
+from authors.apps.authentication.backends import JWTAuthentication
+from authors.apps.authentication.cache import user_cache
+from authors.apps.authentication.models import User
+from authors.apps.authentication.tokens import token_verifier
+
+
+class Command(BaseCommand):
+    help = 'Measure JWT authentication overhead per request with cold ' \
+        'and warm token and user caches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        count = options['requests']
+        with transaction.atomic():
+            user = User.objects.create_user(
+                'authbenchmark', 'authbenchmark@example.com', 'password')
+            request = RequestFactory().get(
+                '/', HTTP_AUTHORIZATION=f'token {user.token}')
+
+            def cold():
+                token_verifier.verified.clear()
+                user_cache.local.clear()
+                JWTAuthentication().authenticate(request)
+
+            def warm():
+                JWTAuthentication().authenticate(request)
+
+            for label, work in (('uncached', cold), ('cached', warm)):
+                started = time.perf_counter()
+                for _ in range(count):
+                    work()
+                elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f'{label:>9}: {elapsed / count * 1e6:8.1f} us/request')
+            transaction.set_rollback(True)
+        user_cache.invalidate(user)
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from authors.apps.authentication.counters import repair_follow_counts
+from authors.apps.authentication.models import User
+
+
+class Command(BaseCommand):
+    help = 'Recompute the denormalized follower and following counts'
+
+    def handle(self, *args, **options):
+        repaired = repair_follow_counts(User)
+        self.stdout.write(f'Repaired {repaired} user(s)')
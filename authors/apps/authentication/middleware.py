@@ -0,0 +1,24 @@
+class AuthTimingMiddleware:
+    """
+    Reports the time spent authenticating a request.
+
+    `JWTAuthentication` records its duration on the request; this adds it
+    to the response as `Server-Timing: auth;dur=<ms>` so the share of
+    latency spent on auth shows up in browser tools and access logs. The
+    description says whether the token and user caches answered.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        timing = getattr(request, 'auth_timing', None)
+        if timing is not None:
+            duration, cached = timing
+            entry = 'auth;desc="{}";dur={:.3f}'.format(
+                'cached' if cached else 'uncached', duration)
+            existing = response.get('Server-Timing')
+            response['Server-Timing'] = \
+                f'{existing}, {entry}' if existing else entry
+        return response
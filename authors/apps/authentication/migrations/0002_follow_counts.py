@@ -0,0 +1,46 @@
+# Generated by Django 2.1.5 on 2026-10-18 11:49
+
+from django.db import migrations, models
+
+from authors.apps.authentication.counters import repair_follow_counts
+
+
+def backfill_follow_counts(apps, schema_editor):
+    repair_follow_counts(apps.get_model('authentication', 'User'))
+
+
+# The auto-created follow table takes no Meta.indexes. Both lists page
+# through one user's rows newest first, seeking on the row id.
+CREATE_FOLLOW_INDEXES = [
+    'CREATE INDEX authentication_user_following_to_user_id_idx '
+    'ON authentication_user_following (to_user_id, id)',
+    'CREATE INDEX authentication_user_following_from_user_id_idx '
+    'ON authentication_user_following (from_user_id, id)',
+]
+DROP_FOLLOW_INDEXES = [
+    'DROP INDEX authentication_user_following_to_user_id_idx',
+    'DROP INDEX authentication_user_following_from_user_id_idx',
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='followers_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='following_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunSQL(CREATE_FOLLOW_INDEXES, DROP_FOLLOW_INDEXES),
+        migrations.RunPython(backfill_follow_counts,
+                             migrations.RunPython.noop),
+    ]
@@ -7,6 +7,13 @@ from django.contrib.auth.models import (
     AbstractBaseUser, BaseUserManager, PermissionsMixin
 )
 from django.db import models
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from authors.apps.core.models import CounterMixin
+
+from .cache import author_summaries, user_cache
 
 
 class UserManager(BaseUserManager):
@@ -52,7 +59,7 @@ class UserManager(BaseUserManager):
         return user
 
 
-class User(AbstractBaseUser, PermissionsMixin):
+class User(CounterMixin, AbstractBaseUser, PermissionsMixin):
     # Each `User` needs a human-readable unique identifier that we can use to
     # represent the `User` in the UI. We want to index this column in the
     # database to improve lookup performance.
@@ -97,6 +104,11 @@ class User(AbstractBaseUser, PermissionsMixin):
     # Id for users a user is following
     following = models.ManyToManyField('User', related_name='followers')
 
+    # Denormalized follow counts, kept in step by FollowUnfollowAPIView.
+    # `manage.py repair_follow_counts` recomputes them.
+    followers_count = models.IntegerField(default=0)
+    following_count = models.IntegerField(default=0)
+
     # A boolean field wheteher a user wants notofications or not
     get_notifications = models.BooleanField(default=True)
 
@@ -110,6 +122,7 @@ class User(AbstractBaseUser, PermissionsMixin):
     # Tells Django that the UserManager class defined above should manage
     # objects of this type.
     objects = UserManager()
+    counter_fields = ('followers_count', 'following_count')
 
     def __str__(self):
         """
@@ -143,6 +156,10 @@ class User(AbstractBaseUser, PermissionsMixin):
         """
         return self.username
 
+    def counters_changed(self):
+        # counters move with UPDATE, which sends no post_save
+        user_cache.invalidate(self)
+
     def generate_jwt_token(self):
         """ Generates a token that expires in 24hrs """
         token = jwt.encode({
@@ -153,3 +170,30 @@ class User(AbstractBaseUser, PermissionsMixin):
         }, settings.SECRET_KEY, algorithm='HS256')
 
         return token.decode('utf-8')
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    """Stop authenticating requests with a stale copy of the user"""
+    user_cache.invalidate(instance)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_author_summary(sender, instance, **kwargs):
+    author_summaries.invalidate(instance.pk)
+
+
+@receiver(m2m_changed, sender=User.following.through)
+def touch_follow_profiles(sender, instance, action, pk_set, **kwargs):
+    """
+    A follow or unfollow changes both profiles' follow lists, so move both
+    users' `updated_at` on for the HTTP validators computed from it and
+    drop their cached author summaries
+    """
+    if action not in ('post_add', 'post_remove') or not pk_set:
+        return
+    users = {instance.pk, *pk_set}
+    User.objects.filter(pk__in=users).update(updated_at=timezone.now())
+    author_summaries.invalidate(*users)
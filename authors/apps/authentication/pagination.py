@@ -0,0 +1,19 @@
+from authors.apps.core.pagination import KeysetPagination
+
+
+class ProfileCursorPagination(KeysetPagination):
+    """Pages through the profile directory in signup order"""
+    ordering = ('id',)
+    results_key = 'Profiles'
+
+
+class FollowingCursorPagination(KeysetPagination):
+    """Pages through whom a user follows, most recent follow first"""
+    ordering = ('-id',)
+    results_key = 'Following'
+
+
+class FollowersCursorPagination(KeysetPagination):
+    """Pages through a user's followers, most recent follow first"""
+    ordering = ('-id',)
+    results_key = 'Followers'
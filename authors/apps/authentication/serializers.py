@@ -201,11 +201,11 @@ class UserSerializer(serializers.ModelSerializer):
 
     def get_followers_total(self, obj):
         """Returns total number of followers"""
-        return obj.followers.count()
+        return obj.followers_count
 
     def get_following_total(self, obj):
         """Returns number of users one is following"""
-        return obj.following.count()
+        return obj.following_count
 
         # The `read_only_fields` option is an alternative for explicitly
         # specifying the field with `read_only=True` like we did for password
@@ -275,11 +275,11 @@ class FollowUnfollowSerializer(serializers.ModelSerializer):
 
     def get_followers_total(self, obj):
         """Returns total number of followers"""
-        return obj.followers.count()
+        return obj.followers_count
 
     def get_following_total(self, obj):
         """Returns number of users one is following"""
-        return obj.following.count()
+        return obj.following_count
 
 
 class ProfilesSerializer(serializers.ModelSerializer):
@@ -303,11 +303,11 @@ class ProfilesSerializer(serializers.ModelSerializer):
 
     def get_followers_total(self, obj):
         """Returns total number of followers"""
-        return obj.followers.count()
+        return obj.followers_count
 
     def get_following_total(self, obj):
         """Returns number of users one is following"""
-        return obj.following.count()
+        return obj.following_count
 
     def get_followers(self, obj):
         followers = []
@@ -332,6 +332,26 @@ class ProfilesSerializer(serializers.ModelSerializer):
         return followingList
 
 
+class ProfileDirectorySerializer(serializers.ModelSerializer):
+    """
+    A profile as listed in the directory, with its follow counts but not
+    the follow lists, which the followers and following endpoints page
+    through
+    """
+    image = serializers.ImageField(read_only=True)
+    followers_total = serializers.IntegerField(
+        source='followers_count', read_only=True)
+    following_total = serializers.IntegerField(
+        source='following_count', read_only=True)
+
+    class Meta:
+        model = User
+        fields = ('id', 'username', 'bio', 'image', 'is_verified',
+                  'created_at', 'updated_at', 'followers_total',
+                  'following_total', 'get_notifications')
+        read_only_fields = fields
+
+
 class SubscriptionSerializer(serializers.Serializer):
 
     def validate(self, validated_data):
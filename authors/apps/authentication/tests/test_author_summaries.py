@@ -0,0 +1,74 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from authors.apps.articles.models import Article
+from ..cache import author_summaries
+from ..models import User
+
+
+class AuthorSummaryCacheTestCase(TestCase):
+    """Tests for the cache of author profile blocks"""
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(
+            'author', 'author@example.com', 'password')
+        self.fan = User.objects.create_user(
+            'fan', 'fan@example.com', 'password')
+
+    def test_summary_matches_user_serializer(self):
+        summary = author_summaries.get(self.author.pk)
+        self.assertEqual(summary['username'], 'author')
+        self.assertEqual(summary['followers'], [])
+        self.assertNotIn('password', summary)
+
+    def test_memo_and_shared_cache(self):
+        """A summary is loaded once, then read from the memo or cache"""
+        context = {}
+        author_summaries.get(self.author.pk, context)
+        with self.assertNumQueries(0):
+            author_summaries.get(self.author.pk, context)
+            author_summaries.get(self.author.pk, {})
+
+    def test_batch_is_loaded_together(self):
+        """Missing users of a batch cost the same queries as one user"""
+        with self.assertNumQueries(3):
+            author_summaries.get(self.author.pk, {}, batch=[self.fan.pk])
+        with self.assertNumQueries(0):
+            author_summaries.get(self.fan.pk, {})
+
+    def test_saves_and_follows_invalidate(self):
+        author_summaries.get(self.author.pk)
+        self.author.bio = 'new bio'
+        self.author.save()
+        self.assertEqual(author_summaries.get(self.author.pk)['bio'],
+                         'new bio')
+        self.fan.following.add(self.author)
+        self.assertEqual(author_summaries.get(self.author.pk)['followers'],
+                         [self.fan.pk])
+        self.assertEqual(author_summaries.get(self.fan.pk)['following'],
+                         [self.author.pk])
+
+    def test_article_list_queries_do_not_grow_with_authors(self):
+        client = APIClient()
+        url = reverse('articles:articles-all')
+
+        def count_queries():
+            cache.clear()
+            with CaptureQueriesContext(connection) as queries:
+                client.get(url)
+            return len(queries)
+
+        Article.objects.create(title='a', description='d', body='b',
+                               author=self.author)
+        few = count_queries()
+        for number in range(3):
+            writer = User.objects.create_user(
+                f'writer{number}', f'writer{number}@example.com', 'password')
+            Article.objects.create(title='a', description='d', body='b',
+                                   author=writer)
+        self.assertEqual(count_queries(), few)
@@ -0,0 +1,98 @@
+from unittest import mock
+
+from django.core.cache import caches
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from rest_framework import exceptions
+
+from authors.apps.authentication.backends import JWTAuthentication
+from authors.apps.authentication.cache import AuthUserCache, user_cache
+from authors.apps.authentication.models import User
+from authors.apps.authentication.tokens import token_verifier
+
+
+class TestJWTAuthentication(TestCase):
+    """Tests for the token authentication backend"""
+
+    def setUp(self):
+        user_cache.local.clear()
+        token_verifier.verified.clear()
+        self.user = User.objects.create_user(
+            username='jey', email='jey@gmail.com', password='password')
+        self.backend = JWTAuthentication()
+
+    def authenticate(self, token):
+        request = RequestFactory().get(
+            '/', HTTP_AUTHORIZATION=f'token {token}')
+        return self.backend.authenticate(request)
+
+    def test_cached_user_skips_the_database(self):
+        """A warm cache authenticates without any query"""
+        self.authenticate(self.user.token)
+        with self.assertNumQueries(0):
+            user, _ = self.authenticate(self.user.token)
+        self.assertEqual(user.pk, self.user.pk)
+
+    def test_saving_a_user_evicts_it(self):
+        """Deactivation is seen by the next authenticated request"""
+        token = self.user.token
+        self.authenticate(token)
+        self.user.is_active = False
+        self.user.save()
+        with self.assertNumQueries(1):
+            user, _ = self.authenticate(token)
+        self.assertFalse(user.is_active)
+
+    def test_password_hash_is_not_cached(self):
+        """Cached users load their password only when it is asked for"""
+        self.authenticate(self.user.token)
+        entry = user_cache.local.get(user_cache.key(self.user.username))
+        self.assertNotIn('password', entry['row'])
+        user, _ = self.authenticate(self.user.token)
+        with self.assertNumQueries(1):
+            self.assertTrue(user.check_password('password'))
+
+    @override_settings(AUTH_USER_CACHE={
+        'ENABLED': True, 'MAX_SIZE': 8, 'TIMEOUT': 60,
+        'BACKEND': 'default'})
+    def test_saves_in_other_processes_are_seen(self):
+        """A local copy is dropped once the shared version moves"""
+        caches['default'].clear()
+        here, elsewhere = AuthUserCache(), AuthUserCache()
+        here.set(self.user)
+        elsewhere.set(self.user)
+        self.user.is_active = False
+        elsewhere.invalidate(self.user)
+        self.assertIsNone(here.get(self.user.username))
+        elsewhere.set(self.user)
+        self.assertFalse(here.get(self.user.username).is_active)
+
+    def test_unknown_user_is_rejected(self):
+        """A valid token for a deleted user fails authentication"""
+        token = self.user.token
+        self.user.delete()
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.authenticate(token)
+
+    def test_malformed_token_is_rejected_before_decoding(self):
+        """Strings that are not JWTs never reach the signature check"""
+        with mock.patch('jwt.decode') as decode:
+            with self.assertRaises(exceptions.AuthenticationFailed):
+                self.authenticate('not-a-jwt')
+        decode.assert_not_called()
+
+    def test_verified_token_is_memoized(self):
+        """A verified token is not decoded again"""
+        token = self.user.token
+        self.authenticate(token)
+        with mock.patch('jwt.decode') as decode:
+            self.authenticate(token)
+        decode.assert_not_called()
+
+    def test_auth_time_is_reported(self):
+        """Authenticated responses carry a Server-Timing entry"""
+        response = self.client.get(
+            reverse('authentication:user_url'),
+            HTTP_AUTHORIZATION=f'token {self.user.token}')
+        self.assertIn('auth;desc="uncached";dur=',
+                      response['Server-Timing'])
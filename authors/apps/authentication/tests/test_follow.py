@@ -1,4 +1,7 @@
+from django.test import TestCase
+from django.urls import reverse
 from rest_framework import status
+from rest_framework.test import APIClient
 
 from authors.apps.authentication.tests.base_test import BaseTest
 from ..models import User
@@ -78,7 +81,79 @@ class FollowUnfollowTestCase(BaseTest):
         token = self.authenticate_user(self.auth_user_data).data["token"]
         test_id = self.create_test_user()
         self.follow_user(test_id, token)
-        response = self.get_following(test_id, token)
-        self.assertIsInstance(response.data['Followers'], list)
-        self.assertIsInstance(response.data['Following'], list)
+        follower = User.objects.get(email=self.auth_user_data['user']['email'])
+        response = self.get_following(follower.pk, token)
+        self.assertEqual(response.data['Following'],
+                         [{'id': test_id, 'username': 'kim'}])
+        self.assertEqual(response.data['count'], 1)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class FollowGraphTestCase(TestCase):
+    """Tests for the follow counters and the paginated follow lists"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.star = User.objects.create_user(
+            'star', 'star@example.com', 'password')
+        self.star.is_verified = True
+        self.star.save()
+        self.fans = [
+            User.objects.create_user(f'fan{number}',
+                                     f'fan{number}@example.com', 'password')
+            for number in range(3)]
+
+    def follow(self, fan, method='post'):
+        self.client.force_authenticate(fan)
+        url = reverse('authentication:follow', kwargs={'id': self.star.pk})
+        return getattr(self.client, method)(url)
+
+    def test_counters_follow_follows_and_unfollows(self):
+        for fan in self.fans:
+            self.follow(fan)
+        self.follow(self.fans[0])  # already followed, counted once
+        self.star.refresh_from_db()
+        self.assertEqual(self.star.followers_count, 3)
+        response = self.follow(self.fans[1], method='delete')
+        self.assertEqual(response.data['user']['following_total'], 0)
+        self.star.refresh_from_db()
+        self.assertEqual(self.star.followers_count, 2)
+        self.assertEqual(self.star.followers.count(), 2)
+
+    def test_saving_a_stale_user_keeps_the_counts(self):
+        stale = User.objects.get(pk=self.star.pk)
+        self.follow(self.fans[0])
+        stale.bio = 'star'
+        stale.save()
+        self.star.refresh_from_db()
+        self.assertEqual(self.star.followers_count, 1)
+        self.assertEqual(self.star.bio, 'star')
+
+    def test_followers_page_newest_first(self):
+        for fan in self.fans:
+            self.follow(fan)
+        url = reverse('authentication:followers',
+                      kwargs={'id': self.star.pk})
+        first = self.client.get(url, {'limit': 2}).data
+        self.assertEqual([user['username'] for user in first['Followers']],
+                         ['fan2', 'fan1'])
+        self.assertEqual(first['count'], 3)
+        second = self.client.get(first['next']).data
+        self.assertEqual([user['username'] for user in second['Followers']],
+                         ['fan0'])
+        self.assertIsNone(second['next'])
+
+    def test_a_page_costs_two_queries(self):
+        for fan in self.fans:
+            self.follow(fan)
+        url = reverse('authentication:followers',
+                      kwargs={'id': self.star.pk})
+        with self.assertNumQueries(2):
+            self.client.get(url)
+
+    def test_repair_follow_counts(self):
+        from ..counters import repair_follow_counts
+        self.fans[0].following.add(self.star)
+        self.assertEqual(repair_follow_counts(User), 2)
+        self.star.refresh_from_db()
+        self.assertEqual(self.star.followers_count, 1)
@@ -1,8 +1,14 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
 from django.utils.encoding import force_bytes
 from django.utils.http import urlsafe_base64_encode
+from rest_framework.test import APIClient
 from rest_framework.views import status
 from django.urls import reverse
 
+from ..cache import user_cache
 from ..models import User
 from .base_test import BaseTest
 
@@ -114,3 +120,133 @@ class ProfilesTestCase(BaseTest):
                                    format='json',
                                    HTTP_AUTHORIZATION=f'token {token}')
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ProfileConditionalGetTestCase(TestCase):
+    """Tests for ETag and Last-Modified revalidation of profiles"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            'owner', 'owner@example.com', 'password')
+        self.fan = User.objects.create_user(
+            'fan', 'fan@example.com', 'password')
+        self.client.force_authenticate(self.fan)
+        self.url = reverse('authentication:user_profile',
+                           args=[self.user.pk])
+
+    def test_unchanged_profile_is_not_modified(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        again = self.client.get(self.url,
+                                HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(again.status_code, status.HTTP_304_NOT_MODIFIED)
+        since = self.client.get(
+            self.url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(since.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_follows_and_follower_edits_change_the_etag(self):
+        """The follow lists show followers' names, so both count"""
+        response = self.client.get(self.url)
+        self.fan.following.add(self.user)
+        followed = self.client.get(self.url,
+                                   HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(followed.status_code, status.HTTP_200_OK)
+        self.fan.username = 'superfan'
+        self.fan.save()
+        renamed = self.client.get(self.url,
+                                  HTTP_IF_NONE_MATCH=followed['ETag'])
+        self.assertEqual(renamed.status_code, status.HTTP_200_OK)
+
+    def test_verify_and_subscribe_change_the_validators(self):
+        """Single-field saves still move the profile's updated_at"""
+        User.objects.filter(pk=self.user.pk).update(
+            updated_at=timezone.now() - timedelta(minutes=5),
+            get_notifications=False)
+        response = self.client.get(self.url)
+        self.client.get(reverse('authentication:verify_email',
+                                args=[self.user.token]))
+        verified = self.client.get(self.url,
+                                   HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(verified.status_code, status.HTTP_200_OK)
+        self.assertTrue(verified.data['is_verified'])
+
+        self.client.force_authenticate(self.user)
+        self.client.put(reverse('authentication:subscribe'))
+        subscribed = self.client.get(self.url,
+                                     HTTP_IF_NONE_MATCH=verified['ETag'])
+        self.assertEqual(subscribed.status_code, status.HTTP_200_OK)
+        self.assertTrue(subscribed.data['get_notifications'])
+        since = self.client.get(
+            self.url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(since.status_code, status.HTTP_200_OK)
+
+
+class StaleUserEditTestCase(TestCase):
+    """Edits never write back columns from a cached request.user"""
+
+    def setUp(self):
+        user_cache.local.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            'owner', 'owner@example.com', 'password')
+        self.client.credentials(HTTP_AUTHORIZATION=f'token {self.user.token}')
+        self.client.get(reverse('authentication:user_url'))
+        # changed elsewhere, unseen by this process's cached copy
+        User.objects.filter(pk=self.user.pk).update(
+            is_verified=True, get_notifications=False)
+
+    def assertUnchanged(self):
+        user = User.objects.get(pk=self.user.pk)
+        self.assertTrue(user.is_verified)
+        self.assertFalse(user.get_notifications)
+        return user
+
+    def test_profile_edit(self):
+        self.client.patch(
+            reverse('authentication:user_profile', args=[self.user.pk]),
+            {'bio': 'hello'}, format='json')
+        self.assertEqual(self.assertUnchanged().bio, 'hello')
+
+    def test_user_edit(self):
+        self.client.put(reverse('authentication:user_url'),
+                        {'user': {'bio': 'hello'}}, format='json')
+        self.assertEqual(self.assertUnchanged().bio, 'hello')
+
+
+class ProfileDirectoryTestCase(TestCase):
+    """Tests for the paginated profile directory"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.users = [
+            User.objects.create_user(f'user{number}',
+                                     f'user{number}@example.com', 'password')
+            for number in range(3)]
+        self.client.force_authenticate(self.users[0])
+        self.url = reverse('authentication:get_profiles')
+
+    def test_profiles_carry_counts_not_lists(self):
+        User.objects.filter(pk=self.users[0].pk).update(followers_count=2)
+        User.objects.filter(pk=self.users[1].pk).update(following_count=1)
+        profiles = self.client.get(self.url).data['Profiles']
+        self.assertEqual([profile['username'] for profile in profiles],
+                         ['user0', 'user1', 'user2'])
+        self.assertEqual(profiles[0]['followers_total'], 2)
+        self.assertEqual(profiles[1]['following_total'], 1)
+        self.assertNotIn('followers', profiles[0])
+        self.assertNotIn('following', profiles[0])
+
+    def test_pages_follow_the_cursor(self):
+        first = self.client.get(self.url, {'limit': 2}).data
+        self.assertEqual(len(first['Profiles']), 2)
+        second = self.client.get(first['next']).data
+        self.assertEqual([profile['username']
+                          for profile in second['Profiles']], ['user2'])
+        self.assertIsNone(second['next'])
+
+    def test_one_query_per_page(self):
+        for user in self.users[1:]:
+            user.following.add(self.users[0])
+        with self.assertNumQueries(1):
+            self.client.get(self.url)
@@ -0,0 +1,52 @@
+import re
+import time
+
+import jwt
+from django.conf import settings
+
+from authors.apps.core.cache import LRUCache
+
+# header.payload.signature, each part base64url encoded
+JWT_SHAPE = re.compile(r'^[\w-]+\.[\w-]+\.[\w-]*$', re.ASCII)
+
+
+class TokenVerifier:
+    """
+    Verifies JWTs signed with `SECRET_KEY`.
+
+    A token that verified is remembered until its `exp`, so later requests
+    carrying it skip the HMAC check and JSON decoding. Strings that cannot
+    be a JWT are rejected before any crypto is attempted.
+    """
+    algorithms = ['HS256']
+
+    def __init__(self, maxsize):
+        self.verified = LRUCache(maxsize)
+
+    def verify(self, token):
+        """
+        Return the token's payload, raising `jwt.InvalidTokenError` if it
+        is malformed, forged or expired.
+        """
+        payload, _ = self.verify_with_status(token)
+        return payload
+
+    def verify_with_status(self, token):
+        """Like `verify`, also telling whether the memo answered"""
+        payload = self.verified.get(token)
+        if payload is not None:
+            return payload, True
+        if not JWT_SHAPE.match(token):
+            raise jwt.DecodeError('Malformed token')
+
+        payload = jwt.decode(token, settings.SECRET_KEY,
+                             algorithms=self.algorithms)
+        expires = payload.get('exp')
+        if isinstance(expires, (int, float)):
+            remaining = expires - time.time()
+            if remaining > 0:
+                self.verified.set(token, payload, remaining)
+        return payload, False
+
+
+token_verifier = TokenVerifier(settings.AUTH_TOKEN_CACHE_SIZE)
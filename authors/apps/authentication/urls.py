@@ -3,6 +3,7 @@ from .views import (
     LoginAPIView, RegistrationAPIView, UserRetrieveUpdateAPIView,
     PasswordResetView, PasswordUpdateView, VerifyAPIView,
     SocialAuthenticationView, FollowUnfollowAPIView, FollowerFollowingAPIView,
+    FollowersAPIView,
     ProfileRetrieveUpdateAPIView, ProfileGetAPIView, SubscribeAPIView,
     UnsubscribeAPIView
 
@@ -23,6 +24,8 @@ urlpatterns = [
          FollowUnfollowAPIView.as_view(), name="follow"),
     path('profiles/<id>/following/',
          FollowerFollowingAPIView.as_view(), name="following"),
+    path('profiles/<id>/followers/',
+         FollowersAPIView.as_view(), name="followers"),
     path('profiles/', ProfileGetAPIView.as_view(), name='get_profiles'),
     path('profiles/<pk>/',
          ProfileRetrieveUpdateAPIView.as_view(), name='user_profile'),
@@ -12,6 +12,8 @@ import jwt
 from django.conf import settings
 from django.contrib.sites.shortcuts import get_current_site
 from django.core.mail import send_mail
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
 from django.shortcuts import get_object_or_404
 from django.template.loader import render_to_string
 from django.utils.http import urlsafe_base64_decode
@@ -23,15 +25,20 @@ from social_core.backends.oauth import BaseOAuth1, BaseOAuth2
 from social_core.exceptions import MissingBackend
 from social_django.utils import load_backend, load_strategy
 
+from authors.apps.core.conditional import conditional, make_etag
+from .pagination import (
+    FollowersCursorPagination, FollowingCursorPagination,
+    ProfileCursorPagination)
 from .renderers import UserJSONRenderer
 from authors.settings import SECRET_KEY     # noqa F401
 from authors import settings            # noqa F401
 from .models import User
 from .mail import MailSender
+from .tokens import token_verifier
 from .serializers import (EmailSerializer, LoginSerializer,
                           PasswordResetSerializer, RegistrationSerializer,
                           SocialAuthenticationSerializer, UserSerializer,
-                          ProfilesSerializer,
+                          ProfilesSerializer, ProfileDirectorySerializer,
                           FollowerFollowingSerializer,
                           FollowUnfollowSerializer,
                           SubscriptionSerializer)
@@ -91,9 +98,10 @@ class VerifyAPIView(APIView):
     def get(self, request, token):
 
         try:
-            email = jwt.decode(token, settings.SECRET_KEY)['email']
+            payload = token_verifier.verify(token)
+            email = payload['email']
             user = User.objects.get(email=email)
-            username = jwt.decode(token, settings.SECRET_KEY)['username']
+            username = payload['username']
 
             if user.is_verified:
                 site_link = get_current_site(request)
@@ -105,7 +113,7 @@ class VerifyAPIView(APIView):
                 }
                 return Response(message, status=status.HTTP_403_FORBIDDEN)
             user.is_verified = True
-            user.save()
+            user.save(update_fields=['is_verified', 'updated_at'])
 
             message = {
                 'message': f'Welcome {username}, '
@@ -156,8 +164,11 @@ class UserRetrieveUpdateAPIView(RetrieveUpdateAPIView):
 
         # Here is that serialize, validate, save pattern we talked about
         # before.
+        # request.user may be a cached copy; edit the current row so the
+        # save does not put back columns changed since
         serializer = self.serializer_class(
-            request.user, data=serializer_data, partial=True
+            User.objects.get(pk=request.user.pk), data=serializer_data,
+            partial=True
         )
         serializer.is_valid(raise_exception=True)
         serializer.save()
@@ -213,7 +224,7 @@ class PasswordUpdateView(UpdateAPIView):
                 token, settings.SECRET_KEY, algorithms=['HS256'])
             user = User.objects.get(email=decode_token['email'])
             user.set_password(password)
-            user.save()
+            user.save(update_fields=['password', 'updated_at'])
             result = {'message': 'Your password has successfully been reset'}
             return Response(result, status=status.HTTP_201_CREATED)
         except Exception as e:
@@ -293,6 +304,17 @@ class FollowUnfollowAPIView(generics.RetrieveUpdateDestroyAPIView):
     """
     permission_classes = (IsAuthenticated,)
 
+    @staticmethod
+    def lock_pair(follower_id, followed_id):
+        """
+        Lock both users' rows, lowest id first so that two users following
+        each other at once cannot deadlock. Follows by the same user are
+        then serialized and the counters move by exactly the rows changed.
+        """
+        users = User.objects.select_for_update().filter(
+            pk__in=[follower_id, followed_id]).order_by('pk').in_bulk()
+        return users[follower_id], users[followed_id]
+
     def post(self, request, id, format=None):
         """
         This method create a user relationship btween the user
@@ -316,24 +338,19 @@ class FollowUnfollowAPIView(generics.RetrieveUpdateDestroyAPIView):
             }
             return Response(message, status=status.HTTP_406_NOT_ACCEPTABLE)
 
-        try:
-            already_followed = request.user.following.filter(pk=id).exists()
-            if already_followed:
+        with transaction.atomic():
+            follower, to_be_followed = self.lock_pair(
+                request.user.pk, to_be_followed.pk)
+            if follower.following.filter(pk=to_be_followed.pk).exists():
                 return Response({
                     'error': 'You already follow this user'
                 },
                     status=status.HTTP_406_NOT_ACCEPTABLE)
-        except Exception as e:
-            return Response({
-                'error': 'Error when following',
-                'message': str(e)
-            },
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-
-        request.user.following.add(to_be_followed)
-        request.user.save()
+            follower.following.add(to_be_followed)
+            follower.adjust_counters(following_count=1)
+            to_be_followed.adjust_counters(followers_count=1)
 
-        serializer = FollowUnfollowSerializer(request.user)
+        serializer = FollowUnfollowSerializer(follower)
         message = {
             "message": "Profile successfully followed",
             "user": serializer.data
@@ -346,24 +363,26 @@ class FollowUnfollowAPIView(generics.RetrieveUpdateDestroyAPIView):
         request and the user with the username passed
         """
         try:
-            User.objects.get(pk=id)
+            followed = User.objects.get(pk=id)
         except Exception:
             return Response({
                 'error': "User not found"
             }, status=status.HTTP_404_NOT_FOUND)
 
-        follower = User.objects.get(pk=request.user.id)
-
-        relationship = follower.following.filter(pk=id).exists()
-        if not relationship:
-            return Response(
-                {
-                    'error': 'You do not follow this user'
-                },
-                status=status.HTTP_400_BAD_REQUEST
-            )
+        with transaction.atomic():
+            follower, followed = self.lock_pair(request.user.pk, followed.pk)
+            relationship = follower.following.filter(pk=followed.pk).exists()
+            if not relationship:
+                return Response(
+                    {
+                        'error': 'You do not follow this user'
+                    },
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            follower.following.remove(followed)
+            follower.adjust_counters(following_count=-1)
+            followed.adjust_counters(followers_count=-1)
 
-        follower.following.remove(id)
         serializer = FollowUnfollowSerializer(follower)
         message = {
             "message": "Profile successfully unfollowed",
@@ -374,37 +393,74 @@ class FollowUnfollowAPIView(generics.RetrieveUpdateDestroyAPIView):
 
 class FollowerFollowingAPIView(generics.ListAPIView):
     """
-    This API returns a list of user followers and following
+    A page of the users a user follows, most recently followed first.
+
+    Pages seek on the follow table's id through an index on (from_user,
+    id), and the total comes from the user's denormalized counter.
     """
+    serializer_class = FollowerFollowingSerializer
+    pagination_class = FollowingCursorPagination
+    # the follow table column holding the user, and the one listed
+    owner_column = 'from_user'
+    listed_column = 'to_user'
+    count_field = 'following_count'
 
     def get_queryset(self):
-        user = get_object_or_404(User, id=self.kwargs['id'])
+        return User.following.through.objects.filter(
+            **{self.owner_column: self.owner}
+        ).select_related(self.listed_column).only(
+            'id', f'{self.listed_column}__id',
+            f'{self.listed_column}__username')
 
-        followed_friends = user.following.all()
-        following_friends = user.followers.all()
+    def get(self, request, id, format=None):
+        self.owner = get_object_or_404(
+            User.objects.only('id', self.count_field), id=id)
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(
+            self.get_queryset(), request, view=self)
+        serializer = self.serializer_class(
+            [getattr(follow, self.listed_column) for follow in page],
+            many=True)
+        response = paginator.get_paginated_response(serializer.data)
+        response.data['count'] = getattr(self.owner, self.count_field)
+        return response
 
-        return {
-            "followed": followed_friends,
-            "followers": following_friends
-        }
 
-    def get(self, request, id, format=None):
-        """Returns the user's followed user"""
+class FollowersAPIView(FollowerFollowingAPIView):
+    """
+    A page of a user's followers, most recent first, seeking through an
+    index on (to_user, id)
+    """
+    pagination_class = FollowersCursorPagination
+    owner_column = 'to_user'
+    listed_column = 'from_user'
+    count_field = 'followers_count'
 
-        if self.get_queryset() is not None:
 
-            following_dict = self.get_queryset()
+def latest_update(users):
+    """A subquery for the newest `updated_at` among `users`"""
+    return Subquery(users.order_by('-updated_at').values('updated_at')[:1])
 
-            follower_serializer = FollowerFollowingSerializer(
-                following_dict['followed'], many=True)
-            following_serializer = FollowerFollowingSerializer(
-                following_dict['followers'], many=True)
 
-            message = {
-                "Followers": follower_serializer.data,
-                "Following": following_serializer.data
-            }
-            return Response(message, status=status.HTTP_200_OK)
+def profile_validators(view, request, pk):
+    """
+    The ETag and Last-Modified of a profile: the newest `updated_at` of the
+    user and of everyone listed as following or followed by them
+    """
+    try:
+        row = User.objects.filter(pk=pk).annotate(
+            followers_updated_at=latest_update(
+                User.objects.filter(following=OuterRef('pk'))),
+            following_updated_at=latest_update(
+                User.objects.filter(followers=OuterRef('pk'))),
+        ).values('updated_at', 'followers_updated_at',
+                 'following_updated_at').first()
+    except ValueError:
+        return None, None
+    if row is None:
+        return None, None
+    last_modified = max(filter(None, row.values()))
+    return make_etag(pk, sorted(row.items())), last_modified
 
 
 class ProfileRetrieveUpdateAPIView(RetrieveUpdateAPIView):
@@ -413,6 +469,7 @@ class ProfileRetrieveUpdateAPIView(RetrieveUpdateAPIView):
     renderer_classes = (UserJSONRenderer,)
     serializer_class = ProfilesSerializer
 
+    @conditional(profile_validators)
     def get(self, request, pk, *args, **kwargs):
         try:
             profile = User.objects.get(
@@ -431,8 +488,11 @@ class ProfileRetrieveUpdateAPIView(RetrieveUpdateAPIView):
                 "message": "You don't have permission to edit this profile"}
             return Response(response, status=status.HTTP_403_FORBIDDEN)
         data = request.data
-        serializer = self.serializer_class(instance=request.user,
-                                           data=data, partial=True)
+        # as in UserRetrieveUpdateAPIView.update, save the current row
+        # rather than the possibly cached request.user
+        serializer = self.serializer_class(
+            instance=User.objects.get(pk=request.user.pk), data=data,
+            partial=True)
         if serializer.is_valid():
             self.check_object_permissions(request, data)
             serializer.save()
@@ -441,15 +501,23 @@ class ProfileRetrieveUpdateAPIView(RetrieveUpdateAPIView):
 
 
 class ProfileGetAPIView(ListAPIView):
+    """
+    The profile directory, a page at a time. Each page costs one query,
+    follow counts included.
+    """
 
     permission_classes = (IsAuthenticated, )
-    serializer_class = ProfilesSerializer
+    serializer_class = ProfileDirectorySerializer
+    pagination_class = ProfileCursorPagination
     queryset = User.objects.all()
 
     def get(self, request):
-        queryset = self.get_queryset()
-        serializer = ProfilesSerializer(queryset, many=True)
-        return Response({"Profiles": serializer.data})
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(
+            self.get_queryset(), request, view=self)
+        serializer = self.serializer_class(
+            page, many=True, context={'request': request})
+        return paginator.get_paginated_response(serializer.data)
 
 
 class SubscribeAPIView(APIView):
@@ -462,7 +530,7 @@ class SubscribeAPIView(APIView):
         user = User.objects.get(email=request.user.email)
         if not user.get_notifications:
             user.get_notifications = True
-            user.save()
+            user.save(update_fields=['get_notifications', 'updated_at'])
             return Response({
                 "message": "You have successfully subscribed"
             }, status=status.HTTP_200_OK)
@@ -485,7 +553,7 @@ class UnsubscribeAPIView(APIView):
         user = User.objects.get(username=username)
         if user.get_notifications:
             user.get_notifications = False
-            user.save()
+            user.save(update_fields=['get_notifications', 'updated_at'])
             return Response({
                 "message": "You have successfully unsubscribed"
             }, status=status.HTTP_200_OK)
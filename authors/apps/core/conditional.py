@@ -0,0 +1,53 @@
+"""
+Conditional GETs.
+
+A view decorated with `conditional` computes its validators, an ETag and a
+Last-Modified time, from a light query over timestamps and counters before
+it runs. A client revalidating a representation that has not changed gets
+a 304 without the full query or the serializer running.
+"""
+import hashlib
+from calendar import timegm
+from functools import wraps
+
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+
+def make_etag(*parts):
+    """A strong, quoted ETag digesting `parts`"""
+    digest = hashlib.md5(repr(parts).encode('utf-8')).hexdigest()
+    return quote_etag(digest)
+
+
+def conditional(validators):
+    """
+    Answer GETs with 304 Not Modified when the client's `If-None-Match` or
+    `If-Modified-Since` still matches.
+
+    `validators(view, request, *args, **kwargs)` returns an `(etag,
+    last_modified)` pair, either of which may be None. Successful responses
+    carry both, and vary by `Authorization` since the validators may depend
+    on the viewer.
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(view, request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return method(view, request, *args, **kwargs)
+            etag, last_modified = validators(view, request, *args, **kwargs)
+            timestamp = last_modified and timegm(last_modified.utctimetuple())
+            response = get_conditional_response(
+                request, etag=etag, last_modified=timestamp)
+            if response is None:
+                response = method(view, request, *args, **kwargs)
+                if not 200 <= response.status_code < 300:
+                    return response
+            if etag:
+                response['ETag'] = etag
+            if timestamp:
+                response['Last-Modified'] = http_date(timestamp)
+            patch_vary_headers(response, ('Authorization',))
+            return response
+        return wrapper
+    return decorator
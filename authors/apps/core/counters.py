@@ -0,0 +1,46 @@
+"""
+Recomputing denormalized counter columns from the rows they count.
+
+Used by the repair commands and by the migrations backfilling new
+counters, so everything here also works on historical models.
+"""
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+
+def count_of(queryset, field):
+    """A correlated subquery counting `queryset` rows per outer row"""
+    counted = queryset.filter(**{field: OuterRef('pk')}).order_by() \
+        .values(field).annotate(total=Count('pk')).values('total')
+    return Coalesce(Subquery(counted, output_field=IntegerField()), 0)
+
+
+def stamped(model, **updates):
+    """
+    `updates` plus the model's counted_at timestamp, if it keeps one.
+    Historical models in migrations do not.
+    """
+    field = getattr(model, 'counted_at_field', None)
+    if field:
+        updates[field] = timezone.now()
+    return updates
+
+
+def repair(model, counters):
+    """
+    Rewrite every counter of `model` that disagrees with its source rows,
+    returning how many rows had drifted.
+    """
+    actual = {f'actual_{name}': expression
+              for name, expression in counters.items()}
+    drifted = model.objects.annotate(**actual).filter(reduce(or_, [
+        ~Q(**{name: F(f'actual_{name}')}) for name in counters]))
+    with transaction.atomic():
+        pks = list(drifted.values_list('pk', flat=True))
+        model.objects.filter(pk__in=pks).update(**stamped(model, **counters))
+    return len(pks)
@@ -0,0 +1,48 @@
+from django.db.models import F
+from django.utils import timezone
+
+
+class CounterMixin:
+    """
+    Maintains denormalized counter columns on a model.
+
+    Counters are shifted with a single `UPDATE ... SET n = n + delta` so
+    concurrent writers never lose each other's increments. A model naming
+    a `counted_at_field` also has that timestamp set by the same UPDATE, so
+    that HTTP validators notice the counters moving.
+
+    Saving a row that already exists writes every column but the
+    `counter_fields` and the counted-at timestamp, so an instance read
+    before an adjustment cannot put its stale counts back.
+    """
+    counter_fields = ()
+    counted_at_field = None
+
+    def save(self, force_insert=False, force_update=False, using=None,
+             update_fields=None):
+        if update_fields is None and not force_insert \
+                and not self._state.adding:
+            skipped = set(self.counter_fields) | {self.counted_at_field}
+            skipped |= self.get_deferred_fields()
+            update_fields = [
+                field.attname for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in skipped
+                and field.attname not in skipped]
+        super().save(force_insert=force_insert, force_update=force_update,
+                     using=using, update_fields=update_fields)
+
+    def adjust_counters(self, **deltas):
+        """Atomically shift the given counter columns by their deltas"""
+        updates = {field: F(field) + delta for field, delta in deltas.items()}
+        if self.counted_at_field:
+            updates[self.counted_at_field] = timezone.now()
+            setattr(self, self.counted_at_field,
+                    updates[self.counted_at_field])
+        type(self)._default_manager.filter(pk=self.pk).update(**updates)
+        # Keep the in-memory copy close enough for the response being built
+        for field, delta in deltas.items():
+            setattr(self, field, getattr(self, field) + delta)
+        self.counters_changed()
+
+    def counters_changed(self):
+        """Called after every adjustment, for models caching their rows"""
@@ -0,0 +1,36 @@
+class FieldSelectionMixin:
+    """
+    Lets clients pick the fields of a serializer with `?fields=a,b` or
+    drop some with `?exclude=c,d`.
+
+    Views resolve the request with `requested_fields` and hand the result
+    to the serializer as `fields`, and to their queryset planner so that
+    relations nobody asked for are never loaded.
+    """
+    fields_query_param = 'fields'
+    exclude_query_param = 'exclude'
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+    @classmethod
+    def requested_fields(cls, request):
+        """
+        The names of the fields to render for `request`, or None for all
+        of them. Unknown names are ignored.
+        """
+        params = request.query_params
+        if cls.fields_query_param not in params and \
+                cls.exclude_query_param not in params:
+            return None
+        fields = set(cls.Meta.fields)
+        if cls.fields_query_param in params:
+            fields &= cls._split(params[cls.fields_query_param])
+        return fields - cls._split(params.get(cls.exclude_query_param, ''))
+
+    @staticmethod
+    def _split(value):
+        return {name.strip() for name in value.split(',') if name.strip()}
@@ -0,0 +1,47 @@
+from django.conf import settings
+from django.core.cache import cache
+
+from notifications.models import Notification
+
+
+class UnreadCounter:
+    """
+    Per-user unread notification counts kept in the cache.
+
+    A count is computed with one indexed COUNT the first time it is read
+    and is then adjusted in place: fan-out increments it and marking
+    notifications read decrements it. Adjustments to a count that is not
+    cached are skipped since the next read recounts anyway.
+    """
+    key_prefix = 'notifications:unread'
+
+    def key(self, user_id):
+        return f'{self.key_prefix}:{user_id}'
+
+    def get(self, user_id):
+        key = self.key(user_id)
+        count = cache.get(key)
+        if count is None:
+            count = Notification.objects.filter(
+                recipient_id=user_id, unread=True).count()
+            cache.add(key, count, settings.NOTIFICATION_UNREAD_TIMEOUT)
+        return count
+
+    def incr(self, user_ids, delta=1):
+        for user_id in user_ids:
+            self._shift(user_id, delta)
+
+    def decr(self, user_id, delta=1):
+        if delta:
+            self._shift(user_id, -delta)
+
+    def _shift(self, user_id, delta):
+        key = self.key(user_id)
+        try:
+            if cache.incr(key, delta) < 0:
+                cache.delete(key)
+        except ValueError:
+            pass
+
+
+unread_counter = UnreadCounter()
@@ -0,0 +1,139 @@
+import logging
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.db.models import Q
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+
+from authors.apps.articles.models import TimelineEntry
+
+from .models import FanoutJob
+from .writer import NotificationWriter
+
+logger = logging.getLogger(__name__)
+
+NEW_ARTICLE_VERB = 'A user you follow has a new post'
+EMAIL_SUBJECT = "Author's Haven Email Notification"
+# Due jobs read per query while racing other workers to claim one
+CLAIM_BATCH = 10
+
+
+def claim_job():
+    """
+    Take the oldest pending job that is due, or one whose worker stopped
+    reporting progress.
+
+    A job is claimed with an UPDATE that only matches while it is still
+    claimable and its attempt count is the one just read, so of several
+    workers picking the same job exactly one wins and the others move on
+    to the next candidate. Unlike SKIP LOCKED this works on PostgreSQL
+    9.4, which CI runs.
+    """
+    while True:
+        now = timezone.now()
+        stale = now - timedelta(
+            seconds=settings.NOTIFICATION_FANOUT_STALE_AFTER)
+        claimable = FanoutJob.objects.filter(
+            Q(status=FanoutJob.PENDING, run_after__lte=now) |
+            Q(status=FanoutJob.RUNNING, updated_at__lt=stale))
+        candidates = list(claimable.order_by('id').values_list(
+            'id', 'attempts')[:CLAIM_BATCH])
+        if not candidates:
+            return None
+        for job_id, attempts in candidates:
+            claimed = claimable.filter(pk=job_id, attempts=attempts).update(
+                status=FanoutJob.RUNNING, attempts=attempts + 1,
+                updated_at=now)
+            if claimed:
+                return FanoutJob.objects.get(pk=job_id)
+
+
+def run_job(job, chunk_size=None):
+    """
+    Notify every subscribed follower of the job's article author, and
+    add the article to every follower's timeline when feeds are written
+    ahead of time
+    """
+    chunk_size = chunk_size or settings.NOTIFICATION_FANOUT_CHUNK_SIZE
+    article = job.article
+    followers = article.author.followers.filter(
+        get_notifications=True).order_by('id').only(
+        'id', 'username', 'email')
+
+    try:
+        if settings.ARTICLE_FEED_STRATEGY == 'write' and \
+                not job.last_follower_id:
+            TimelineEntry.fan_out(article, chunk_size)
+        # One SMTP session for the whole job instead of one per follower
+        with get_connection() as connection:
+            while True:
+                chunk = list(followers.filter(
+                    id__gt=job.last_follower_id)[:chunk_size])
+                if not chunk:
+                    break
+                with transaction.atomic():
+                    notify_chunk(article, chunk, connection)
+                    job.last_follower_id = chunk[-1].id
+                    job.save(update_fields=['last_follower_id',
+                                            'updated_at'])
+    except Exception as error:
+        logger.exception('Fan-out of %s failed', article.slug)
+        job.status = FanoutJob.PENDING \
+            if job.attempts < settings.NOTIFICATION_FANOUT_MAX_ATTEMPTS \
+            else FanoutJob.FAILED
+        job.error = str(error)
+        job.run_after = timezone.now() + retry_delay(job.attempts)
+        job.save(update_fields=['status', 'error', 'run_after',
+                                'updated_at'])
+        return False
+
+    job.status = FanoutJob.DONE
+    job.save(update_fields=['status', 'updated_at'])
+    return True
+
+
+def retry_delay(attempts):
+    """How long to wait after a job's `attempts`th failure, doubling"""
+    return timedelta(seconds=settings.NOTIFICATION_FANOUT_RETRY_DELAY *
+                     2 ** (attempts - 1))
+
+
+def notify_chunk(article, followers, connection):
+    """Insert the notifications and send the e-mails for one chunk"""
+    NotificationWriter(article.author, NEW_ARTICLE_VERB,
+                       action_object=article).write(followers)
+    connection.send_messages(
+        [article_email(article, follower) for follower in followers])
+
+
+def article_email(article, user):
+    """The new-article e-mail for a single follower"""
+    backend_url = os.getenv("HEROKU_BACKEND_URL")
+    uuid = urlsafe_base64_encode(force_bytes(user)).decode("utf-8")
+    message = render_to_string('create_article.html', {
+        'title': EMAIL_SUBJECT,
+        'username': user.username,
+        'link': f'{backend_url}/articles/{article.slug}',
+        'subscription': f'{backend_url}/api/v1/users/unsubscribe/{uuid}/'
+    })
+    email = EmailMultiAlternatives(
+        EMAIL_SUBJECT, '', os.getenv('EMAIL_HOST_USER'), [user.email])
+    email.attach_alternative(message, 'text/html')
+    return email
+
+
+def run_pending_jobs(chunk_size=None):
+    """Work through the queue until it is empty, returning the job count"""
+    processed = 0
+    job = claim_job()
+    while job is not None:
+        run_job(job, chunk_size)
+        processed += 1
+        job = claim_job()
+    return processed
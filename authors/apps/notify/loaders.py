@@ -0,0 +1,46 @@
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Prefetch
+from notifications.models import Notification
+
+from authors.apps.articles.models import Article
+from authors.apps.authentication.models import User
+
+
+def load_related(notifications, viewer):
+    """
+    Resolve the articles of a page of notifications in a fixed number of
+    queries. Actors come from the author summary cache.
+
+    The generic `action_object` relation would otherwise fetch its article,
+    and then `NotificationSerializer` would query its likes, per
+    notification. Instead every article on the page is loaded in bulk, with
+    what the nested serializer reads prefetched, and planted in the
+    relation's cache.
+    """
+    article_type = ContentType.objects.get_for_model(Article)
+
+    def ids_of(relation, content_type):
+        return {getattr(notification, f'{relation}_object_id')
+                for notification in notifications
+                if getattr(notification, f'{relation}_content_type_id') ==
+                content_type.id}
+
+    articles = Article.objects.for_serializer(viewer).in_bulk(
+        ids_of('action_object', article_type))
+
+    for notification in notifications:
+        if notification.action_object_content_type_id == article_type.id:
+            article = articles.get(notification.action_object_object_id)
+            if article is not None:
+                Notification.action_object.set_cached_value(
+                    notification, article)
+    return notifications
+
+
+def with_recipient(queryset):
+    """Join each notification's recipient and prefetch its follow lists"""
+    ids_only = User.objects.only('id')
+    return queryset.select_related('recipient').prefetch_related(
+        Prefetch('recipient__followers', queryset=ids_only),
+        Prefetch('recipient__following', queryset=ids_only),
+    )
@@ -0,0 +1,63 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from notifications.signals import notify
+
+from authors.apps.authentication.models import User
+from authors.apps.notify.writer import NotificationWriter
+
+PREFIX = 'notifybench'
+VERB = 'benchmark notification'
+
+
+class Command(BaseCommand):
+    help = 'Compare notification rows/sec of notify.send against ' \
+        'NotificationWriter. Seeded rows are rolled back afterwards.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--followers', type=int, nargs='+',
+            default=[1000, 10000, 100000],
+            help='Recipient counts to benchmark')
+        parser.add_argument(
+            '--batch-size', type=int,
+            default=settings.NOTIFICATION_BULK_BATCH_SIZE)
+        parser.add_argument(
+            '--skip-per-user', action='store_true',
+            help='Only time the bulk writer')
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'{"followers":>10} {"per-user rows/s":>16} '
+                          f'{"bulk rows/s":>12}')
+        for count in options['followers']:
+            with transaction.atomic():
+                actor, recipients = self.seed(count)
+                per_user = None
+                if not options['skip_per_user']:
+                    per_user = self.rate(count, lambda: [
+                        notify.send(actor, recipient=recipient, verb=VERB)
+                        for recipient in recipients])
+                writer = NotificationWriter(
+                    actor, VERB, batch_size=options['batch_size'])
+                bulk = self.rate(count, lambda: writer.write(recipients))
+                transaction.set_rollback(True)
+            per_user = f'{per_user:,.0f}' if per_user else '-'
+            self.stdout.write(f'{count:>10} {per_user:>16} {bulk:>12,.0f}')
+
+    @staticmethod
+    def seed(count):
+        for start in range(0, count + 1, 1000):
+            User.objects.bulk_create(
+                User(username=f'{PREFIX}{i}', email=f'{PREFIX}{i}@example.com')
+                for i in range(start, min(start + 1000, count + 1)))
+        users = list(User.objects.filter(
+            username__startswith=PREFIX).only('id').order_by('id'))
+        return users[0], users[1:]
+
+    @staticmethod
+    def rate(count, work):
+        start = time.perf_counter()
+        work()
+        return count / (time.perf_counter() - start)
@@ -0,0 +1,31 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from authors.apps.notify.fanout import run_pending_jobs
+
+
+class Command(BaseCommand):
+    help = 'Deliver queued new-article notifications to followers'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Drain the queue and exit instead of polling forever')
+        parser.add_argument(
+            '--chunk-size', type=int,
+            default=settings.NOTIFICATION_FANOUT_CHUNK_SIZE,
+            help='Followers notified per transaction')
+        parser.add_argument(
+            '--poll-interval', type=float, default=2.0,
+            help='Seconds to wait when the queue is empty')
+
+    def handle(self, *args, **options):
+        while True:
+            processed = run_pending_jobs(options['chunk_size'])
+            if processed:
+                self.stdout.write(f'Processed {processed} fan-out job(s)')
+            if options['once']:
+                break
+            time.sleep(options['poll_interval'])
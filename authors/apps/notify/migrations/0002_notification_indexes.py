@@ -0,0 +1,26 @@
+# Generated by Django 2.1.5 on 2026-10-18 11:40
+
+from django.db import migrations
+
+# django-notifications owns the table, so its indexes are created with SQL
+# here rather than declared on the model.
+INDEXES = {
+    'notify_recipient_timestamp_idx': '(recipient_id, timestamp, id)',
+    'notify_recipient_unread_timestamp_idx':
+        '(recipient_id, unread, timestamp, id)',
+}
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0006_indexes'),
+        ('notify', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            [f'CREATE INDEX {name} ON notifications_notification {columns}'],
+            [f'DROP INDEX {name}'])
+        for name, columns in INDEXES.items()
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 2.1.5 on 2026-10-18 12:11
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notify', '0002_notification_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='fanoutjob',
+            name='run_after',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
@@ -0,0 +1,41 @@
+from django.db import models
+from django.utils import timezone
+
+
+class FanoutJob(models.Model):
+    """
+    A queued notification of an author's followers about a new article.
+
+    Creating an article only inserts one of these rows; the
+    `notification_worker` management command claims it and works through
+    the followers in id order, recording its progress in
+    `last_follower_id` so an interrupted job resumes where it stopped.
+    A failed attempt is retried no sooner than `run_after`.
+    """
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = (
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    )
+
+    article = models.ForeignKey(
+        'articles.Article',
+        related_name='fanout_jobs',
+        on_delete=models.CASCADE
+    )
+    status = models.CharField(
+        max_length=10, choices=STATUSES, default=PENDING, db_index=True)
+    last_follower_id = models.IntegerField(default=0)
+    attempts = models.IntegerField(default=0)
+    run_after = models.DateTimeField(default=timezone.now)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'{self.article_id} ({self.status})'
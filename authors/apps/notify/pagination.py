@@ -0,0 +1,7 @@
+from authors.apps.core.pagination import KeysetPagination
+
+
+class NotificationCursorPagination(KeysetPagination):
+    """Pages through notifications newest first"""
+    ordering = ('-timestamp', '-id')
+    results_key = 'notifications'
@@ -9,6 +9,10 @@ class NotificationJSONRenderer(JSONRenderer):
         """
         Render the articles in a structured manner for the end user.
         """
+        if isinstance(data, dict) and \
+                ('notifications' in data or 'unread_count' in data):
+            # a page enveloped along with its cursors, or the counters
+            return json.dumps(data)
         if data is not None:
             if len(data) <= 1:
                 return json.dumps({
@@ -1,16 +1,18 @@
+from django.contrib.contenttypes.models import ContentType
 from rest_framework import serializers
 
+from authors.apps.authentication.cache import author_summaries
 from authors.apps.authentication.models import User
 from notifications.models import Notification
 from authors.apps.authentication.serializers import UserSerializer
-from authors.apps.articles.serializers import ArticleSerializer
+from authors.apps.articles.serializers import ArticleSerializer, page_of
 
 
 class NotificationSerializer(serializers.ModelSerializer):
     '''
     notification serializer
     '''
-    actor = UserSerializer('actor_object_id')
+    actor = serializers.SerializerMethodField()
     action_object = ArticleSerializer('action_object_object_id')
     recipient = UserSerializer(User, read_only=True)
 
@@ -21,3 +23,36 @@ class NotificationSerializer(serializers.ModelSerializer):
         model = Notification
         fields = ('id', 'actor', 'unread', 'verb', 'recipient',
                   'action_object', 'timesince')
+
+    def get_actor(self, obj):
+        """The acting user's profile, from the shared summary cache"""
+        return author_summaries.get(
+            self.user_id(obj), self.context,
+            batch=[self.user_id(notification)
+                   for notification in page_of(self)])
+
+    @staticmethod
+    def user_id(notification):
+        user_type = ContentType.objects.get_for_model(User)
+        if notification.actor_content_type_id != user_type.id:
+            return None
+        return int(notification.actor_object_id)
+
+
+class MarkReadSerializer(serializers.Serializer):
+    """
+    Selects the notifications to mark as read: exactly one of `all`,
+    `ids` or `before` must be given
+    """
+    all = serializers.BooleanField(required=False)
+    ids = serializers.ListField(
+        child=serializers.IntegerField(), required=False, max_length=1000)
+    before = serializers.DateTimeField(required=False)
+
+    def validate(self, data):
+        if data.get('all') is False:
+            del data['all']
+        if len(data) != 1:
+            raise serializers.ValidationError(
+                'Provide exactly one of all, ids or before')
+        return data
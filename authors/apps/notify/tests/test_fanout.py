@@ -0,0 +1,99 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core import mail
+from django.utils import timezone
+from notifications.models import Notification
+
+from authors.apps.authentication.models import User
+from authors.apps.authentication.tests.base_test import BaseTest
+from authors.apps.notify.fanout import claim_job, run_pending_jobs
+from authors.apps.notify.models import FanoutJob
+from authors.apps.notify.writer import NotificationWriter
+
+
+class TestFollowerFanout(BaseTest):
+    """Tests for the background new-article notification fan-out"""
+
+    def setUp(self):
+        super().setUp()
+        self.author_token = self.authenticate_user(
+            self.auth_user_data).data['token']
+        author = User.objects.get(
+            email=self.auth_user_data['user']['email'])
+        for data in (self.user_data, self.auth_user2_data,
+                     self.auth_user3_data):
+            token = self.authenticate_user(data).data['token']
+            self.follow_user(author.id, token)
+        User.objects.filter(username='famescience').update(
+            get_notifications=False)
+        mail.outbox = []
+
+    def publish(self):
+        return self.client.post(
+            self.articles_url, self.article, format='json',
+            HTTP_AUTHORIZATION=f'token {self.author_token}')
+
+    def test_publishing_only_queues_a_job(self):
+        """Creating an article defers the fan-out to the worker"""
+        self.publish()
+        self.assertEqual(FanoutJob.objects.get().status, FanoutJob.PENDING)
+        self.assertEqual(Notification.objects.count(), 0)
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_worker_notifies_subscribed_followers_in_chunks(self):
+        """The worker notifies every subscribed follower once"""
+        self.publish()
+        self.assertEqual(run_pending_jobs(chunk_size=1), 1)
+        job = FanoutJob.objects.get()
+        self.assertEqual(job.status, FanoutJob.DONE)
+        recipients = Notification.objects.values_list(
+            'recipient__username', flat=True)
+        self.assertCountEqual(recipients, ['James', 'madgenius'])
+        self.assertCountEqual([message.to[0] for message in mail.outbox], [
+            'wearethephoenix34@gmail.com', 'einstein@gmail.com'])
+        self.assertEqual(run_pending_jobs(), 0)
+
+    def test_a_job_is_claimed_once(self):
+        """Claimed jobs are skipped until their worker goes quiet"""
+        self.publish()
+        job = claim_job()
+        self.assertEqual((job.status, job.attempts), (FanoutJob.RUNNING, 1))
+        self.assertIsNone(claim_job())
+        FanoutJob.objects.update(
+            updated_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(claim_job().attempts, 2)
+
+    def test_failed_jobs_back_off(self):
+        """A failed job waits, longer each time, before it is retried"""
+        self.publish()
+        with mock.patch('authors.apps.notify.fanout.notify_chunk',
+                        side_effect=OSError('smtp down')), \
+                self.assertLogs('authors.apps.notify.fanout', 'ERROR'):
+            self.assertEqual(run_pending_jobs(), 1)
+            job = FanoutJob.objects.get()
+            self.assertEqual(job.status, FanoutJob.PENDING)
+            first_delay = job.run_after - job.updated_at
+            self.assertGreater(first_delay.total_seconds(), 0)
+            self.assertEqual(run_pending_jobs(), 0)
+
+            FanoutJob.objects.update(run_after=timezone.now())
+            self.assertEqual(run_pending_jobs(), 1)
+            job.refresh_from_db()
+            self.assertEqual(job.attempts, 2)
+            self.assertGreater(job.run_after - job.updated_at, first_delay)
+
+        FanoutJob.objects.update(run_after=timezone.now())
+        self.assertEqual(run_pending_jobs(), 1)
+        self.assertEqual(FanoutJob.objects.get().status, FanoutJob.DONE)
+
+    def test_writer_inserts_rows_in_batches(self):
+        """The bulk writer notifies every recipient across batches"""
+        author = User.objects.get(username='PaulGichuki')
+        writer = NotificationWriter(author, 'says hello', batch_size=2)
+        written = writer.write(author.followers.all())
+        self.assertEqual(written, 3)
+        notification = Notification.objects.filter(
+            recipient__username='James').get()
+        self.assertEqual(notification.actor, author)
+        self.assertEqual(notification.verb, 'says hello')
@@ -0,0 +1,171 @@
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from notifications.models import Notification
+
+from authors.apps.articles.models import Article
+from authors.apps.authentication.models import User
+from authors.apps.authentication.tests.base_test import BaseTest
+from authors.apps.notify.writer import NotificationWriter
+
+
+def run_commit_hooks():
+    """
+    Run the on_commit callbacks queued so far, as the transaction wrapping
+    each TestCase never commits
+    """
+    callbacks = connection.run_on_commit
+    connection.run_on_commit = []
+    for _, callback in callbacks:
+        callback()
+
+
+class NotificationTestCase(BaseTest):
+    """Signs in a reader and delivers notifications to them"""
+
+    def setUp(self):
+        super().setUp()
+        self.token = self.authenticate_user(self.user_data).data['token']
+        self.reader = User.objects.get(username='James')
+
+    def notify_about_new_articles(self, count):
+        """Have a fresh author publish `count` articles for the reader"""
+        author = User.objects.create_user(
+            f'author{Article.objects.count()}',
+            f'author{Article.objects.count()}@example.com', 'password')
+        for _ in range(count):
+            article = Article.objects.create(
+                title='news', body='body', description='d', author=author)
+            NotificationWriter(author, 'posted', action_object=article) \
+                .write([self.reader])
+
+    def list_notifications(self, **params):
+        return self.client.get(self.notification_url, params,
+                               HTTP_AUTHORIZATION=f'token {self.token}')
+
+
+class TestNotificationList(NotificationTestCase):
+    """Tests for listing a user's notifications"""
+
+    def test_notifications_are_paginated(self):
+        """Notifications come newest first in cursor linked pages"""
+        self.notify_about_new_articles(3)
+        response = self.list_notifications(limit=2)
+        self.assertEqual(len(response.data['notifications']), 2)
+        response = self.client.get(response.data['next'],
+                                   HTTP_AUTHORIZATION=f'token {self.token}')
+        self.assertEqual(len(response.data['notifications']), 1)
+        self.assertIsNone(response.data['next'])
+
+    def test_unread_only_filter(self):
+        """Read notifications can be filtered out"""
+        self.notify_about_new_articles(2)
+        Notification.objects.filter(
+            pk=Notification.objects.first().pk).update(unread=False)
+        response = self.list_notifications(unread_only='true')
+        self.assertEqual(len(response.data['notifications']), 1)
+
+    def test_page_query_count_is_constant(self):
+        """Each page loads actors and articles in bulk"""
+        def count_queries():
+            # start from cold author summaries, loaded in one batch
+            cache.clear()
+            with CaptureQueriesContext(connection) as queries:
+                response = self.list_notifications()
+            return len(queries), len(response.data['notifications'])
+
+        self.notify_about_new_articles(1)
+        self.list_notifications()  # warm the authentication caches
+        few, listed = count_queries()
+        self.assertEqual(listed, 1)
+        self.notify_about_new_articles(3)
+        self.notify_about_new_articles(2)
+        many, listed = count_queries()
+        self.assertEqual(listed, 6)
+        self.assertEqual(few, many)
+
+
+class TestMarkNotificationsRead(NotificationTestCase):
+    """Tests for the bulk mark-as-read and unread count endpoints"""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.read_url = reverse('notify:notifications-read')
+        self.count_url = reverse('notify:notifications-unread-count')
+
+    def unread_count(self):
+        response = self.client.get(self.count_url,
+                                   HTTP_AUTHORIZATION=f'token {self.token}')
+        return response.data['unread_count']
+
+    def mark_read(self, data):
+        return self.client.post(self.read_url, data, format='json',
+                                HTTP_AUTHORIZATION=f'token {self.token}')
+
+    def test_count_follows_new_notifications(self):
+        """Writing notifications bumps a cached count"""
+        self.assertEqual(self.unread_count(), 0)
+        self.notify_about_new_articles(3)
+        run_commit_hooks()
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.unread_count(), 3)
+        self.assertNotIn('COUNT', ' '.join(q['sql'] for q in queries))
+
+    def test_rolled_back_notifications_are_not_counted(self):
+        """Counts only move for notifications that were committed"""
+        self.assertEqual(self.unread_count(), 0)
+        try:
+            with transaction.atomic():
+                self.notify_about_new_articles(2)
+                raise RuntimeError('mail server down')
+        except RuntimeError:
+            pass
+        run_commit_hooks()
+        self.assertEqual(Notification.objects.count(), 0)
+        self.assertEqual(self.unread_count(), 0)
+
+    def test_mark_all_read(self):
+        """Every unread notification is marked read"""
+        self.notify_about_new_articles(3)
+        response = self.mark_read({'all': True})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['marked_read'], 3)
+        self.assertEqual(response.data['unread_count'], 0)
+        self.assertFalse(self.reader.notifications.unread().exists())
+
+    def test_mark_ids_read(self):
+        """Only the listed notifications are marked read"""
+        self.notify_about_new_articles(3)
+        ids = list(self.reader.notifications.values_list('id', flat=True))
+        response = self.mark_read({'ids': ids[:2]})
+        self.assertEqual(response.data['marked_read'], 2)
+        self.assertEqual(self.unread_count(), 1)
+
+    def test_mark_read_before(self):
+        """Notifications up to a timestamp are marked read"""
+        self.notify_about_new_articles(1)
+        before = self.reader.notifications.get().timestamp
+        self.notify_about_new_articles(1)
+        self.reader.notifications.filter(timestamp__gt=before).update(
+            timestamp=before.replace(year=before.year + 1))
+        response = self.mark_read({'before': before.isoformat()})
+        self.assertEqual(response.data['marked_read'], 1)
+        self.assertEqual(self.unread_count(), 1)
+
+    def test_reading_one_decrements_count(self):
+        """Opening a notification marks it read and lowers the count"""
+        self.notify_about_new_articles(2)
+        self.assertEqual(self.unread_count(), 2)
+        notification = self.reader.notifications.first()
+        self.client.get(
+            reverse('notify:single-notification', args=[notification.id]),
+            HTTP_AUTHORIZATION=f'token {self.token}')
+        self.assertEqual(self.unread_count(), 1)
+
+    def test_requires_exactly_one_selector(self):
+        """Ambiguous or empty requests are rejected"""
+        self.assertEqual(self.mark_read({}).status_code, 400)
+        self.assertEqual(
+            self.mark_read({'all': True, 'ids': [1]}).status_code, 400)
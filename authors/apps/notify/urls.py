@@ -1,10 +1,15 @@
 from django.urls import path
 
-from .views import NotificationViewList, SingleNotification
+from .views import (MarkNotificationsRead, NotificationViewList,
+                    SingleNotification, UnreadNotificationCount)
 
 urlpatterns = [
     path('notifications/', NotificationViewList.as_view(),
          name='notifications'),
+    path('notifications/read/', MarkNotificationsRead.as_view(),
+         name='notifications-read'),
+    path('notifications/unread_count/', UnreadNotificationCount.as_view(),
+         name='notifications-unread-count'),
     path('notifications/<id>/', SingleNotification.as_view(),
          name='single-notification')
 
@@ -3,7 +3,10 @@ from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from django.http import Http404
-from .serializers import NotificationSerializer
+from .counters import unread_counter
+from .loaders import load_related, with_recipient
+from .pagination import NotificationCursorPagination
+from .serializers import MarkReadSerializer, NotificationSerializer
 # from .signal import *
 from .renderers import NotificationJSONRenderer
 
@@ -16,16 +19,22 @@ class NotificationViewList(APIView):
     renderer_classes = (NotificationJSONRenderer,)
     serializer_class = NotificationSerializer
 
+    pagination_class = NotificationCursorPagination
+
     def get(self, request):
-        queryset = self.request.user.notifications.all().order_by('-timestamp')
+        queryset = with_recipient(self.request.user.notifications.all())
+        if request.query_params.get('unread_only') in ('true', '1'):
+            queryset = queryset.filter(unread=True)
 
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        load_related(page, request.user)
         serializer = self.serializer_class(
-            queryset,
+            page,
             many=True,
             context={'request': request}
         )
-        serializer.data
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return paginator.get_paginated_response(serializer.data)
 
 
 class SingleNotification(APIView):
@@ -47,7 +56,9 @@ class SingleNotification(APIView):
         else:
             if notification.unread:
                 notification.mark_as_read()
+                unread_counter.decr(request.user.id)
 
+        load_related([notification], request.user)
         serializer = self.serializer_class(
             notification,
             many=False,
@@ -55,3 +66,42 @@ class SingleNotification(APIView):
         )
 
         return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class MarkNotificationsRead(APIView):
+    """
+    Mark all, a list of, or everything up to a point in time of the
+    current user's notifications as read in a single UPDATE
+    """
+    permission_classes = (IsAuthenticated,)
+    renderer_classes = (NotificationJSONRenderer,)
+    serializer_class = MarkReadSerializer
+
+    def post(self, request):
+        serializer = self.serializer_class(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        criteria = serializer.validated_data
+
+        queryset = request.user.notifications.filter(unread=True)
+        if 'ids' in criteria:
+            queryset = queryset.filter(id__in=criteria['ids'])
+        elif 'before' in criteria:
+            queryset = queryset.filter(timestamp__lte=criteria['before'])
+        marked = queryset.update(unread=False)
+        unread_counter.decr(request.user.id, marked)
+
+        return Response({
+            'marked_read': marked,
+            'unread_count': unread_counter.get(request.user.id)
+        }, status=status.HTTP_200_OK)
+
+
+class UnreadNotificationCount(APIView):
+    "get the number of unread notifications of the current user"
+    permission_classes = (IsAuthenticated,)
+    renderer_classes = (NotificationJSONRenderer,)
+
+    def get(self, request):
+        return Response({
+            'unread_count': unread_counter.get(request.user.id)
+        }, status=status.HTTP_200_OK)
@@ -0,0 +1,65 @@
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.utils import timezone
+from notifications.models import Notification
+
+from .counters import unread_counter
+
+
+class NotificationWriter:
+    """
+    Writes one event's notification to many recipients.
+
+    `notify.send` saves every recipient's row with its own INSERT and
+    content type lookups. The writer resolves the content types once and
+    inserts the rows with `bulk_create`, `batch_size` rows per statement.
+    """
+
+    def __init__(self, actor, verb, action_object=None, target=None,
+                 batch_size=None, timestamp=None):
+        self.batch_size = batch_size or \
+            settings.NOTIFICATION_BULK_BATCH_SIZE
+        self.template = {
+            'actor_content_type': ContentType.objects.get_for_model(actor),
+            'actor_object_id': actor.pk,
+            'verb': verb,
+            'timestamp': timestamp or timezone.now(),
+        }
+        for name, obj in (('action_object', action_object),
+                          ('target', target)):
+            if obj is not None:
+                self.template[f'{name}_content_type'] = \
+                    ContentType.objects.get_for_model(obj)
+                self.template[f'{name}_object_id'] = obj.pk
+
+    def build(self, recipient_id):
+        """An unsaved notification for the recipient with this id"""
+        return Notification(recipient_id=recipient_id, **self.template)
+
+    def write(self, recipients):
+        """
+        Insert a notification for each recipient, given as users or user
+        ids, returning the number of rows written.
+        """
+        written = 0
+        batch = []
+        for recipient in recipients:
+            batch.append(self.build(getattr(recipient, 'pk', recipient)))
+            if len(batch) >= self.batch_size:
+                written += self._flush(batch)
+                batch = []
+        if batch:
+            written += self._flush(batch)
+        return written
+
+    def _flush(self, batch):
+        # Let the backend split the batch further if it caps the number
+        # of parameters per statement (SQLite)
+        Notification.objects.bulk_create(batch)
+        # Counts move only once the rows are committed, so a rolled back
+        # chunk leaves them alone and no reader recounts before the commit
+        # and then has its count bumped again
+        recipient_ids = [notification.recipient_id for notification in batch]
+        transaction.on_commit(lambda: unread_counter.incr(recipient_ids))
+        return len(batch)
@@ -62,6 +62,7 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 
     'social_django.middleware.SocialAuthExceptionMiddleware',
+    'authors.apps.authentication.middleware.AuthTimingMiddleware',
 
 ]
 
@@ -158,6 +159,54 @@ CORS_ORIGIN_WHITELIST = (
 # called `INSTALLED_APPS`.
 AUTH_USER_MODEL = 'authentication.User'
 
+# Shared cache for counters and cached responses. Without REDIS_URL every
+# process keeps its own local-memory cache, which only suits development.
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django_redis.cache.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Users resolved by JWTAuthentication are cached in-process for TIMEOUT
+# seconds. Set BACKEND to a CACHES alias to also share them between
+# processes and to have every process see saves at once; without one,
+# other processes may use a changed user for up to TIMEOUT seconds, so
+# keep it short.
+AUTH_USER_CACHE = {
+    'ENABLED': True,
+    'MAX_SIZE': 1024,
+    'TIMEOUT': 60,
+    'BACKEND': os.getenv('AUTH_USER_CACHE_BACKEND'),
+}
+
+# Serialized articles, less the viewer's like state, are cached for
+# TIMEOUT seconds in the BACKEND cache alias
+ARTICLE_CACHE = {
+    'ENABLED': True,
+    'TIMEOUT': 60 * 60,
+    'BACKEND': 'default',
+}
+
+# UserSerializer output for article authors, favoriting users and
+# notification actors is cached for TIMEOUT seconds in the BACKEND alias
+AUTHOR_SUMMARY_CACHE = {
+    'ENABLED': True,
+    'TIMEOUT': 5 * 60,
+    'BACKEND': 'default',
+}
+
+# Tokens that passed signature verification are remembered until they
+# expire, at most this many per process
+AUTH_TOKEN_CACHE_SIZE = 4096
+
 REST_FRAMEWORK = {
     'EXCEPTION_HANDLER': 'authors.apps.core.exceptions.core_exception_handler',
     'NON_FIELD_ERRORS_KEY': 'error',
@@ -176,6 +225,39 @@ EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD')
 EMAIL_PORT = os.getenv('EMAIL_PORT')
 EMAIL_USE_TLS = os.getenv('EMAIL_USE_TLS')
 
+# How the following feed is built: 'read' merges the followed authors'
+# articles on every request, 'write' copies each new article into its
+# author's followers' timelines from the notification worker.
+ARTICLE_FEED_STRATEGY = os.getenv('ARTICLE_FEED_STRATEGY', 'read')
+
+# Replies shown under each comment when listing an article's comments;
+# the rest are paged in through the comment's `replies_cursor`
+COMMENT_INLINE_REPLIES = int(os.getenv('COMMENT_INLINE_REPLIES', 3))
+
+# Trending articles, rescored by `manage.py refresh_trending`: each like,
+# favorite, rating and comment adds its weight to the article's score,
+# which halves every TRENDING_HALF_LIFE seconds.
+TRENDING_WEIGHTS = {'like': 1.0, 'favorite': 2.0, 'rating': 1.5,
+                    'comment': 3.0}
+TRENDING_HALF_LIFE = 6 * 60 * 60
+TRENDING_MIN_SCORE = 0.01
+TRENDING_SIZE = 50
+TRENDING_CACHE_TIMEOUT = 60 * 60
+
+# Follower fan-out of new-article notifications, run by
+# `manage.py notification_worker`
+NOTIFICATION_FANOUT_CHUNK_SIZE = int(
+    os.getenv('NOTIFICATION_FANOUT_CHUNK_SIZE', 500))
+NOTIFICATION_FANOUT_STALE_AFTER = 15 * 60
+NOTIFICATION_FANOUT_MAX_ATTEMPTS = 5
+# Seconds before a failed job is retried, doubled after each failure
+NOTIFICATION_FANOUT_RETRY_DELAY = 60
+# Seconds a user's cached unread notification count is kept
+NOTIFICATION_UNREAD_TIMEOUT = 60 * 60
+# Notification rows per INSERT when notifying many users of one event
+NOTIFICATION_BULK_BATCH_SIZE = int(
+    os.getenv('NOTIFICATION_BULK_BATCH_SIZE', 1000))
+
 # Social authentication variables
 SOCIAL_AUTH_FACEBOOK_KEY = os.getenv('FACEBOOK_KEY')
 SOCIAL_AUTH_FACEBOOK_SECRET = os.getenv('FACEBOOK_SECRET')